@@ -9,6 +9,7 @@ from app.core.security import decode_token
 from app.crud import user
 from app.db import get_db
 from app.models import User
+from app.services import user_cache
 
 # Определяем OAuth2 схему с путем получения токена
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
@@ -44,12 +45,15 @@ async def get_current_user(
             detail="Could not validate credentials",
         )
 
-    current_user = await user.get(db, id=token_data.sub)
-
-    if not current_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-        )
+    # Пользователь из кэша присоединяется к сессии без запроса к базе данных
+    current_user = await user_cache.get(db, token_data.sub)
+    if current_user is None:
+        current_user = await user.get(db, id=token_data.sub)
+        if not current_user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+            )
+        user_cache.put(current_user)
 
     return current_user
 
@@ -1,7 +1,7 @@
 from datetime import timedelta
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -12,14 +12,15 @@ from app.core.security import create_access_token
 from app.crud import user
 from app.db import get_db
 from app.models import User
-from app.schemas import Token, UserCreate
-from app.schemas import User as UserSchema
+from app.schemas import Token, User as UserSchema, UserCreate
+from app.services import credential_admission
 
 router = APIRouter()
 
 
 @router.post("/register", status_code=status.HTTP_201_CREATED)
 async def register_user(
+    request: Request,
     user_data: UserCreate,
     db: AsyncSession = Depends(get_db),
 ) -> Any:
@@ -27,6 +28,7 @@ async def register_user(
     Регистрация нового пользователя
 
     Args:
+        request: Входящий запрос
         user_data: Данные пользователя для регистрации
         db: Сессия базы данных
 
@@ -35,22 +37,24 @@ async def register_user(
 
     Raises:
         HTTPException: Если пользователь с таким email уже существует
+            или превышен лимит запросов
     """
-    existing_user = await user.get_by_email(db, email=user_data.email)
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="User with this email already exists",
-        )
-
-    existing_user = await user.get_by_username(db, username=user_data.username)
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="User with this username already exists",
-        )
-
-    await user.create(db, obj_in=user_data)
+    async with credential_admission.admit(request, email=user_data.email):
+        existing_user = await user.get_by_email(db, email=user_data.email)
+        if existing_user:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="User with this email already exists",
+            )
+
+        existing_user = await user.get_by_username(db, username=user_data.username)
+        if existing_user:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="User with this username already exists",
+            )
+
+        await user.create(db, obj_in=user_data)
 
     return JSONResponse(
         {"message": "User successfully registered"}, status_code=status.HTTP_201_CREATED
@@ -59,14 +63,17 @@ async def register_user(
 
 @router.post("/login", response_model=Token)
 async def login_access_token(
-    db: AsyncSession = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    form_data: OAuth2PasswordRequestForm = Depends(),
 ) -> Any:
     """
     Получение OAuth2 токена для аутентификации
     """
-    db_user = await user.authenticate(
-        db, email=form_data.username, password=form_data.password
-    )
+    async with credential_admission.admit(request, email=form_data.username):
+        db_user = await user.authenticate(
+            db, email=form_data.username, password=form_data.password
+        )
     if not db_user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -0,0 +1,29 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends
+
+from app.api.dependencies.auth import get_current_superuser
+from app.api.websockets import manager as websocket_manager
+from app.core.security import password_hasher, token_cache
+from app.models import User
+from app.services import credential_admission, user_cache
+
+router = APIRouter()
+
+
+@router.get("/")
+async def read_metrics(
+    current_user: User = Depends(get_current_superuser),
+) -> Any:
+    """
+    Счетчики процесса для мониторинга: WebSocket соединения, кэши
+    пользователей и токенов, допуск входа и пул хеширования паролей.
+    Значения относятся к текущему воркеру, доступно только суперпользователю.
+    """
+    return {
+        "websockets": websocket_manager.stats(),
+        "user_cache": user_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "credential_admission": credential_admission.stats(),
+        "password_hasher": password_hasher.stats(),
+    }
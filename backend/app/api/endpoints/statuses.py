@@ -1,7 +1,13 @@
-from typing import Any, List
-
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi import status as status_code
+from typing import Any, List, Optional
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Request,
+    Response,
+    status as status_code,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies.auth import get_current_active_user, get_current_superuser
@@ -9,21 +15,35 @@ from app.crud import status
 from app.db import get_db
 from app.models import User
 from app.schemas import TaskStatus, TaskStatusCreate, TaskStatusUpdate
+from app.services import status_registry
+from app.utils.etag import ETAG_HEADER, etag_matches, make_etag, not_modified
+from app.utils.pagination import set_next_cursor
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[TaskStatus])
 async def read_statuses(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
+    after: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
-    Получение списка статусов задач
+    Получение списка статусов задач.
+    Поддерживает If-None-Match: ETag строится по содержимому кэша статусов.
     """
-    statuses = await status.get_multi(db, skip=skip, limit=limit)
+    await status_registry.ensure_loaded(db)
+    etag = make_etag(status_registry.digest, skip, limit, after)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    statuses = await status.get_multi_cached(db, skip=skip, limit=limit, after=after)
+    set_next_cursor(response, status, statuses, limit)
+    response.headers[ETAG_HEADER] = etag
     return statuses
 
 
@@ -56,7 +76,7 @@ async def read_status(
     """
     Получение информации о статусе задачи по ID
     """
-    db_status = await status.get(db, id=status_id)
+    db_status = await status.get_cached(db, id=status_id)
     if not db_status:
         raise HTTPException(
             status_code=status_code.HTTP_404_NOT_FOUND,
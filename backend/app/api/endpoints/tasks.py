@@ -1,6 +1,7 @@
-from typing import Any, List
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies.auth import get_current_active_user, get_current_superuser
@@ -11,41 +12,149 @@ from app.api.dependencies.tasks import (
 )
 from app.crud import task
 from app.db import get_db
-from app.models import User, Task as TaskModel
-from app.schemas import Task, TaskCreate, TaskDetail, TaskUpdate
+from app.models import Task as TaskModel, User
+from app.schemas import (
+    TaskCreate,
+    TaskDashboard,
+    TaskDetail,
+    TaskFilter,
+    TaskListFormat,
+    TaskListNormalized,
+    TaskStats,
+    TaskStatus as TaskStatusSchema,
+    TaskStatusCounters,
+    TaskUpdate,
+    User as UserSchema,
+)
+from app.services import status_registry
+from app.utils.etag import ETAG_HEADER, etag_matches, make_etag, not_modified
+from app.utils.pagination import set_next_cursor
+from app.utils.serialization import json_response
 
 router = APIRouter()
 
+# Ответ списков задач в формате detail или normalized
+TaskListResponse = Union[List[TaskDetail], TaskListNormalized]
+
+# Заранее построенные сериализаторы ответов списков задач
+task_detail_list_adapter = TypeAdapter(List[TaskDetail])
+task_list_normalized_adapter = TypeAdapter(TaskListNormalized)
+task_dashboard_adapter = TypeAdapter(TaskDashboard)
+
+
+def related_schemas(
+    tasks: Sequence[TaskModel],
+) -> Tuple[Dict[int, UserSchema], Dict[int, TaskStatusSchema]]:
+    """
+    Схемы пользователей и статусов, связанных с задачами. Каждый пользователь
+    валидируется один раз, сколько бы задач на него ни ссылалось
+    (валидация email - самая дорогая часть сериализации), а статусы
+    берутся из status_registry
+    """
+    users = {}
+    statuses = {}
+    for t in tasks:
+        members = [t.creator]
+        members.extend(assignee.user for assignee in t.assignees)
+        members.extend(watcher.user for watcher in t.watchers)
+        for member in members:
+            if member is not None and member.id not in users:
+                users[member.id] = UserSchema.model_validate(member)
+        db_status = status_registry.get(t.status_id)
+        if db_status is not None:
+            statuses[db_status.id] = db_status
+    return users, statuses
+
+
+def task_detail_data(
+    t: TaskModel,
+    users: Dict[int, UserSchema],
+    statuses: Dict[int, TaskStatusSchema],
+) -> Dict[str, Any]:
+    """
+    Данные схемы TaskDetail для объекта модели Task без построения модели
+    с уже провалидированными пользователями и статусом из related_schemas
+    """
+    return {
+        "id": t.id,
+        "title": t.title,
+        "description": t.description,
+        "creator": users[t.creator.id] if t.creator is not None else None,
+        "status": statuses.get(t.status_id),
+        "assignees": [users[assignee.user_id] for assignee in t.assignees],
+        "watchers": [users[watcher.user_id] for watcher in t.watchers],
+        "created_at": t.created_at,
+        "updated_at": t.updated_at,
+        "status_id": t.status_id,
+        "creator_id": t.creator_id,
+    }
+
 
 def task_to_detail(t: TaskModel) -> TaskDetail:
     """Преобразует объект модели Task в схему TaskDetail"""
-    return TaskDetail(
-        id=t.id,
-        title=t.title,
-        description=t.description,
-        creator=t.creator,
-        status=t.status,
-        assignees=[assignee.user for assignee in t.assignees],
-        watchers=[watcher.user for watcher in t.watchers],
-        created_at=t.created_at,
-        updated_at=t.updated_at,
-        status_id=t.status_id,
-        creator_id=t.creator_id
+    return TaskDetail(**task_detail_data(t, *related_schemas([t])))
+
+
+def tasks_to_normalized(tasks: Sequence[TaskModel]) -> Dict[str, Any]:
+    """
+    Данные схемы TaskListNormalized, в которых каждый пользователь и статус
+    встречается один раз
+    """
+    users, statuses = related_schemas(tasks)
+    items = [
+        {
+            "id": t.id,
+            "title": t.title,
+            "description": t.description,
+            "status_id": t.status_id,
+            "creator_id": t.creator_id,
+            "assignee_ids": [assignee.user_id for assignee in t.assignees],
+            "watcher_ids": [watcher.user_id for watcher in t.watchers],
+            "created_at": t.created_at,
+            "updated_at": t.updated_at,
+        }
+        for t in tasks
+    ]
+    return {"tasks": items, "users": users, "statuses": statuses}
+
+
+def render_task_list(
+    tasks: Sequence[TaskModel],
+    response_format: TaskListFormat,
+    response: Optional[Response] = None,
+) -> Response:
+    """Сериализует список задач в запрошенном формате сразу в JSON"""
+    if response_format == "normalized":
+        return json_response(
+            task_list_normalized_adapter, tasks_to_normalized(tasks), response
+        )
+    users, statuses = related_schemas(tasks)
+    return json_response(
+        task_detail_list_adapter,
+        [task_detail_data(t, users, statuses) for t in tasks],
+        response,
     )
 
 
-@router.get("/", response_model=List[TaskDetail])
+@router.get("/", response_model=TaskListResponse)
 async def read_tasks(
+    response: Response,
     db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
+    after: Optional[str] = None,
+    filters: TaskFilter = Depends(),
+    response_format: TaskListFormat = Query("detail", alias="format"),
     current_user: User = Depends(get_current_superuser),
 ) -> Any:
     """
     Получение списка задач
     """
-    db_tasks = await task.get_multi(db, skip=skip, limit=limit)
-    return [task_to_detail(t) for t in db_tasks]
+    db_tasks = await task.get_multi(
+        db, skip=skip, limit=limit, after=after, filters=filters
+    )
+    set_next_cursor(response, task, db_tasks, limit, keyset=task.keyset_for(filters))
+    return render_task_list(db_tasks, response_format, response)
 
 
 @router.post("/", response_model=TaskDetail)
@@ -67,11 +176,15 @@ async def create_task(
     return task_to_detail(created_task)
 
 
-@router.get("/me", response_model=List[TaskDetail])
+@router.get("/me", response_model=TaskListResponse)
 async def read_my_tasks(
+    response: Response,
     db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
+    after: Optional[str] = None,
+    filters: TaskFilter = Depends(),
+    response_format: TaskListFormat = Query("detail", alias="format"),
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
@@ -79,68 +192,182 @@ async def read_my_tasks(
     (созданные им, назначенные ему или за которыми он наблюдает)
     """
     db_tasks = await task.get_user_tasks(
-        db, user_id=current_user.id, skip=skip, limit=limit
+        db,
+        user_id=current_user.id,
+        skip=skip,
+        limit=limit,
+        after=after,
+        filters=filters,
     )
-    return [task_to_detail(t) for t in db_tasks]
+    set_next_cursor(response, task, db_tasks, limit, keyset=task.keyset_for(filters))
+    return render_task_list(db_tasks, response_format, response)
 
 
-@router.get("/created", response_model=List[TaskDetail])
+@router.get("/created", response_model=TaskListResponse)
 async def read_created_tasks(
+    response: Response,
     db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
+    after: Optional[str] = None,
+    filters: TaskFilter = Depends(),
+    response_format: TaskListFormat = Query("detail", alias="format"),
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
     Получение задач, созданных текущим пользователем
     """
     db_tasks = await task.get_by_creator(
-        db, creator_id=current_user.id, skip=skip, limit=limit
+        db,
+        creator_id=current_user.id,
+        skip=skip,
+        limit=limit,
+        after=after,
+        filters=filters,
     )
-    return [task_to_detail(t) for t in db_tasks]
+    set_next_cursor(response, task, db_tasks, limit, keyset=task.keyset_for(filters))
+    return render_task_list(db_tasks, response_format, response)
 
 
-@router.get("/assigned", response_model=List[TaskDetail])
+@router.get("/assigned", response_model=TaskListResponse)
 async def read_assigned_tasks(
+    response: Response,
     db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
+    after: Optional[str] = None,
+    filters: TaskFilter = Depends(),
+    response_format: TaskListFormat = Query("detail", alias="format"),
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
     Получение задач, назначенных текущему пользователю
     """
     db_tasks = await task.get_assigned_to_user(
-        db, user_id=current_user.id, skip=skip, limit=limit
+        db,
+        user_id=current_user.id,
+        skip=skip,
+        limit=limit,
+        after=after,
+        filters=filters,
     )
-    return [task_to_detail(t) for t in db_tasks]
+    set_next_cursor(response, task, db_tasks, limit, keyset=task.keyset_for(filters))
+    return render_task_list(db_tasks, response_format, response)
 
 
-@router.get("/watching", response_model=List[TaskDetail])
+@router.get("/watching", response_model=TaskListResponse)
 async def read_watching_tasks(
+    response: Response,
     db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
+    after: Optional[str] = None,
+    filters: TaskFilter = Depends(),
+    response_format: TaskListFormat = Query("detail", alias="format"),
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
     Получение задач, за которыми наблюдает текущий пользователь
     """
     db_tasks = await task.get_watched_by_user(
-        db, user_id=current_user.id, skip=skip, limit=limit
+        db,
+        user_id=current_user.id,
+        skip=skip,
+        limit=limit,
+        after=after,
+        filters=filters,
+    )
+    set_next_cursor(response, task, db_tasks, limit, keyset=task.keyset_for(filters))
+    return render_task_list(db_tasks, response_format, response)
+
+
+@router.get("/dashboard", response_model=TaskDashboard)
+async def read_task_dashboard(
+    db: AsyncSession = Depends(get_db),
+    limit: int = 100,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Получение задач текущего пользователя одним запросом: списки ID созданных,
+    назначенных и наблюдаемых задач и словарь самих задач без повторов
+    """
+    buckets, db_tasks = await task.get_user_dashboard(
+        db, user_id=current_user.id, limit=limit
+    )
+    users, statuses = related_schemas(db_tasks)
+    return json_response(
+        task_dashboard_adapter,
+        {
+            **buckets,
+            "tasks": {t.id: task_detail_data(t, users, statuses) for t in db_tasks},
+        },
+    )
+
+
+@router.get("/stats", response_model=TaskStats)
+async def read_task_stats(
+    db: AsyncSession = Depends(get_db),
+    all_users: bool = False,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Получение счетчиков задач текущего пользователя по статусам и ролям
+    (all_users=true - по всем задачам, только для суперпользователей)
+    """
+    if all_users and not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="The user doesn't have enough privileges",
+        )
+
+    rows = await task.get_stats(db, user_id=None if all_users else current_user.id)
+    by_status = [TaskStatusCounters(**row._mapping) for row in rows]
+    return TaskStats(
+        total=sum(item.total for item in by_status),
+        created=sum(item.created for item in by_status),
+        assigned=sum(item.assigned for item in by_status),
+        watching=sum(item.watching for item in by_status),
+        by_status=by_status,
     )
-    return [task_to_detail(t) for t in db_tasks]
 
 
 @router.get("/{task_id}", response_model=TaskDetail)
 async def read_task(
     task_id: int,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
-    Получение конкретной задачи по ID
+    Получение конкретной задачи по ID.
+    Поддерживает If-None-Match: при совпадении ETag возвращается 304
+    без загрузки задачи.
     """
+    version = await task.get_version(db, id=task_id, user_id=current_user.id)
+    if not version:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Task not found"
+        )
+    if not version.has_access and not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions to access this task",
+        )
+
+    # Статус входит в ответ, поэтому его содержимое тоже входит в ETag
+    await status_registry.ensure_loaded(db, [version.status_id])
+    db_status = status_registry.get(version.status_id)
+    etag = make_etag(
+        task_id,
+        version.updated_at,
+        version.creator_updated_at,
+        version.members_version,
+        db_status.model_dump_json() if db_status else None,
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     db_task = await task.get(db, id=task_id)
     if not db_task:
         raise HTTPException(
@@ -150,6 +377,7 @@ async def read_task(
     # Проверка прав доступа к задаче
     await check_task_permissions(db_task=db_task, current_user=current_user)
 
+    response.headers[ETAG_HEADER] = etag
     return task_to_detail(db_task)
 
 
@@ -1,35 +1,49 @@
-from typing import Any, List
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies.auth import get_current_active_user, get_current_superuser
 from app.crud import user
 from app.db import get_db
 from app.models import User
-from app.schemas import User as UserSchema
-from app.schemas import UserCreate, UserUpdate
+from app.schemas import User as UserSchema, UserCreate, UserUpdate
+from app.services import credential_admission
+from app.utils.etag import ETAG_HEADER, etag_matches, make_etag, not_modified
+from app.utils.pagination import set_next_cursor
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[UserSchema])
 async def read_users(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
+    after: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
-    Получение списка пользователей (только для суперпользователей)
+    Получение списка пользователей (только для суперпользователей).
+    Поддерживает If-None-Match: ETag строится по версии страницы из базы данных.
     """
-    users = await user.get_multi(db, skip=skip, limit=limit)
+    version = await user.get_page_version(db, skip=skip, limit=limit, after=after)
+    etag = make_etag(version, skip, limit, after)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    users = await user.get_multi(db, skip=skip, limit=limit, after=after)
+    set_next_cursor(response, user, users, limit)
+    response.headers[ETAG_HEADER] = etag
     return users
 
 
 @router.post("/", response_model=UserSchema)
 async def create_user(
     *,
+    request: Request,
     db: AsyncSession = Depends(get_db),
     user_in: UserCreate,
     current_user: User = Depends(get_current_superuser),
@@ -37,21 +51,22 @@ async def create_user(
     """
     Создание нового пользователя (только для суперпользователей)
     """
-    db_user = await user.get_by_email(db, email=user_in.email)
-    if db_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered",
-        )
-
-    db_user = await user.get_by_username(db, username=user_in.username)
-    if db_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already registered",
-        )
-
-    return await user.create(db, obj_in=user_in)
+    async with credential_admission.admit(request, email=user_in.email):
+        db_user = await user.get_by_email(db, email=user_in.email)
+        if db_user:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Email already registered",
+            )
+
+        db_user = await user.get_by_username(db, username=user_in.username)
+        if db_user:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Username already registered",
+            )
+
+        return await user.create(db, obj_in=user_in)
 
 
 @router.get("/me", response_model=UserSchema)
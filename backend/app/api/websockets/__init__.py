@@ -1,7 +1,10 @@
 from fastapi import APIRouter
-from .chat import task_comments_websocket
+from .chat import manager, task_comments_websocket, user_websocket
 
 router = APIRouter()
 
 # WebSocket эндпоинт для комментариев к задаче
 router.websocket("/tasks/{task_id}/comments")(task_comments_websocket)
+
+# Общий WebSocket пользователя с подписками на несколько задач
+router.websocket("/ws")(user_websocket)
@@ -0,0 +1,103 @@
+import asyncio
+import logging
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from app.api.websockets.codecs import EncodedMessage
+
+logger = logging.getLogger(__name__)
+
+
+class BatchedEvent(NamedTuple):
+    """Событие задачи, ожидающее отправки в пакете"""
+
+    message: EncodedMessage
+    droppable: bool
+    exclude_user_id: Optional[int]
+
+
+# Отправка накопленных событий задачи: (task_id, events)
+Flush = Callable[[int, List[BatchedEvent]], None]
+
+
+class EventBatcher:
+    """
+    Накопление событий задачи в пакеты для соединений в режиме batching.
+
+    Первое событие после паузы отправляется сразу и открывает окно в window
+    секунд. События, пришедшие внутри окна, копятся и по его окончании
+    отправляются одним кадром, после чего окно открывается снова. Окно без
+    событий закрывается. Поэтому при редких событиях задержки нет, а под
+    нагрузкой задача получает не больше одного кадра за окно. Когда накопилось
+    max_events событий, пакет отправляется не дожидаясь конца окна.
+    """
+
+    def __init__(self, window: float, max_events: int, flush: Flush):
+        """
+        Args:
+            window: Длительность окна накопления в секундах
+            max_events: Максимальное количество событий в пакете
+            flush: Отправка пакета соединениям задачи
+        """
+        self.window = window
+        self.max_events = max_events
+        self.flush = flush
+        self.immediate = 0
+        self.batches = 0
+        self.batched_events = 0
+        # {task_id: события открытого окна}, задачи без окна отсутствуют
+        self._pending: Dict[int, List[BatchedEvent]] = {}
+        self._timers: Dict[int, asyncio.TimerHandle] = {}
+
+    def add(self, task_id: int, event: BatchedEvent) -> bool:
+        """
+        Регистрация события задачи
+
+        Returns:
+            True, если событие отложено в пакет, False - если окно было
+            закрыто и событие нужно отправить сразу
+        """
+        events = self._pending.get(task_id)
+        if events is None:
+            self._pending[task_id] = []
+            self._arm(task_id)
+            self.immediate += 1
+            return False
+        events.append(event)
+        if len(events) >= self.max_events:
+            self._timers.pop(task_id).cancel()
+            self._flush(task_id)
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        """Счетчики отправленных сразу событий и пакетов"""
+        return {
+            "batch_windows": len(self._pending),
+            "batch_immediate": self.immediate,
+            "batches": self.batches,
+            "batched_events": self.batched_events,
+        }
+
+    def _arm(self, task_id: int) -> None:
+        self._timers[task_id] = asyncio.get_running_loop().call_later(
+            self.window, self._expire, task_id
+        )
+
+    def _expire(self, task_id: int) -> None:
+        """Конец окна: отправка накопленного или закрытие пустого окна"""
+        self._timers.pop(task_id, None)
+        if self._pending.get(task_id):
+            self._flush(task_id)
+        else:
+            self._pending.pop(task_id, None)
+
+    def _flush(self, task_id: int) -> None:
+        """Отправка пакета и открытие следующего окна"""
+        events = self._pending[task_id]
+        self._pending[task_id] = []
+        self._arm(task_id)
+        self.batches += 1
+        self.batched_events += len(events)
+        try:
+            self.flush(task_id, events)
+        except Exception:
+            logger.exception("Failed to flush websocket batch")
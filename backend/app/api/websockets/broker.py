@@ -0,0 +1,186 @@
+import asyncio
+import json
+import logging
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+# Доставка сообщения локальным соединениям: (task_id, message, exclude_user_id)
+Deliver = Callable[[int, dict, Optional[int]], Awaitable[None]]
+
+
+class Broker(ABC):
+    """
+    Рассылка сообщений WebSocket между процессами приложения.
+
+    ConnectionManager публикует сообщения через брокер, а брокер вызывает
+    deliver в каждом процессе, где могут быть подключены получатели.
+    """
+
+    def __init__(self, deliver: Deliver):
+        """
+        Args:
+            deliver: Доставка сообщения соединениям текущего процесса
+        """
+        self.deliver = deliver
+
+    async def start(self) -> None:
+        """Запуск брокера при старте приложения"""
+
+    async def stop(self) -> None:
+        """Остановка брокера при завершении приложения"""
+
+    @abstractmethod
+    async def publish(
+        self, task_id: int, message: dict, exclude_user_id: Optional[int] = None
+    ) -> None:
+        """Публикация сообщения для всех подключенных к задаче"""
+
+
+class InMemoryBroker(Broker):
+    """Брокер в пределах одного процесса: сообщение сразу доставляется локально"""
+
+    async def publish(
+        self, task_id: int, message: dict, exclude_user_id: Optional[int] = None
+    ) -> None:
+        await self.deliver(task_id, message, exclude_user_id)
+
+
+class PostgresBroker(Broker):
+    """
+    Брокер на Postgres LISTEN/NOTIFY.
+
+    Каждый процесс держит одно выделенное соединение, подписанное на канал,
+    и доставляет полученные сообщения своим соединениям, в том числе
+    собственные публикации. Публикация идет через общий пул движка, а
+    выделенное соединение открывается к той же базе.
+    NOTIFY ограничивает размер payload, поэтому длинные сообщения делятся на
+    части, которые отправляются в одной транзакции и собираются получателем.
+    """
+
+    channel = "taskflow_ws"
+    # Ограничение Postgres - 8000 байт, оставляем запас на заголовок части
+    max_payload = 7000
+    reconnect_delay = 1.0
+
+    def __init__(self, deliver: Deliver, engine: AsyncEngine = engine):
+        """
+        Args:
+            deliver: Доставка сообщения соединениям текущего процесса
+            engine: Движок базы данных, через которую идут уведомления
+        """
+        super().__init__(deliver)
+        self.engine = engine
+        self._connection: Optional[asyncpg.Connection] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._consumer: Optional[asyncio.Task] = None
+        self._payloads: "asyncio.Queue[str]" = asyncio.Queue()
+        self._chunks: Dict[str, List[Optional[str]]] = {}
+
+    async def start(self) -> None:
+        self._consumer = asyncio.create_task(self._consume())
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        for background in (self._listener, self._consumer):
+            if background:
+                background.cancel()
+        if self._connection and not self._connection.is_closed():
+            await self._connection.close()
+
+    async def publish(
+        self, task_id: int, message: dict, exclude_user_id: Optional[int] = None
+    ) -> None:
+        payload = json.dumps(
+            {"task_id": task_id, "message": message, "exclude": exclude_user_id},
+            ensure_ascii=False,
+        )
+        async with self.engine.begin() as conn:
+            for chunk in self._split(payload):
+                await conn.execute(
+                    text("SELECT pg_notify(:channel, :payload)"),
+                    {"channel": self.channel, "payload": chunk},
+                )
+
+    def _split(self, payload: str) -> List[str]:
+        """Деление payload на части вида "id:номер:всего:данные" при необходимости"""
+        if len(payload.encode()) <= self.max_payload:
+            return ["-" + payload]
+        # Части считаются по символам, 4 байта на символ UTF-8 в худшем случае
+        size = self.max_payload // 4
+        parts = [payload[i : i + size] for i in range(0, len(payload), size)]
+        message_id = uuid.uuid4().hex
+        return [
+            f"{message_id}:{number}:{len(parts)}:{part}"
+            for number, part in enumerate(parts)
+        ]
+
+    def _join(self, chunk: str) -> Optional[str]:
+        """Сборка payload из частей, None - пока получены не все части"""
+        if chunk.startswith("-"):
+            return chunk[1:]
+        message_id, number, total, part = chunk.split(":", 3)
+        parts = self._chunks.setdefault(message_id, [None] * int(total))
+        parts[int(number)] = part
+        if any(item is None for item in parts):
+            return None
+        del self._chunks[message_id]
+        return "".join(parts)
+
+    async def _listen(self) -> None:
+        """Поддержание выделенного соединения с LISTEN с переподключением"""
+        while True:
+            closed = asyncio.Event()
+            try:
+                url = self.engine.url
+                self._connection = await asyncpg.connect(
+                    host=url.host,
+                    port=url.port,
+                    user=url.username,
+                    password=url.password,
+                    database=url.database,
+                )
+                self._connection.add_termination_listener(lambda _: closed.set())
+                await self._connection.add_listener(self.channel, self._on_notify)
+                await closed.wait()
+                logger.warning("Broker listener connection closed, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Broker listener failed, reconnecting")
+            # Части сообщений с потерянного соединения уже не будут собраны
+            self._chunks.clear()
+            await asyncio.sleep(self.reconnect_delay)
+
+    def _on_notify(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        """Колбэк asyncpg, очередь сохраняет порядок доставки"""
+        self._payloads.put_nowait(payload)
+
+    async def _consume(self) -> None:
+        """Последовательная доставка полученных сообщений локальным соединениям"""
+        while True:
+            chunk = await self._payloads.get()
+            try:
+                payload = self._join(chunk)
+                if payload is None:
+                    continue
+                data = json.loads(payload)
+                await self.deliver(data["task_id"], data["message"], data["exclude"])
+            except Exception:
+                logger.exception("Failed to deliver broker message")
+
+
+def create_broker(deliver: Deliver) -> Broker:
+    """Брокер, выбранный в настройках WEBSOCKET_BROKER"""
+    if settings.WEBSOCKET_BROKER == "postgres":
+        return PostgresBroker(deliver)
+    return InMemoryBroker(deliver)
@@ -1,42 +1,321 @@
-from fastapi import WebSocket, WebSocketDisconnect, status, Depends
+import asyncio
+import logging
+from collections import Counter
+from typing import Callable
+
+from fastapi import WebSocket, WebSocketDisconnect, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db import get_db
-from app.schemas import CommentCreate, CommentUpdate
-from app.crud import comment as crud_comment, task
 from app.api.dependencies.auth import get_current_user
-from app.api.dependencies.tasks import check_task_permissions
+from app.api.websockets.batching import BatchedEvent, EventBatcher
+from app.api.websockets.broker import Broker, Deliver, create_broker
+from app.api.websockets.codecs import Codec, EncodedMessage, select_codec
+from app.api.websockets.connection import DROPPABLE_TYPES, HEARTBEAT_TYPES, Connection
+from app.api.websockets.frames import HISTORY_CHANGING_TYPES, HistoryCache
+from app.api.websockets.typing_indicator import TypingThrottle
+from app.core.config import settings
+from app.crud import comment as crud_comment, task
+from app.db.session import AsyncSessionLocal
+from app.models import User
+from app.schemas import CommentCreate, CommentUpdate
+from app.services import user_cache
+
+logger = logging.getLogger(__name__)
+
+# Служебное сообщение брокера: пользователь изменился, запись кэша устарела
+USER_INVALIDATED = "user_invalidated"
 
 
 class ConnectionManager:
-    def __init__(self):
-        # Структура: {task_id: {user_id: websocket}}
-        self.active_connections: dict[int, dict[int, WebSocket]] = {}
+    def __init__(self, broker_factory: Callable[[Deliver], Broker] = create_broker):
+        # Подписки по задачам: {task_id: {user_id: {connection, ...}}}, у пользователя
+        # может быть несколько вкладок, а одно соединение может быть подписано
+        # на несколько задач
+        self.active_connections: dict[int, dict[int, set[Connection]]] = {}
+        # Все открытые соединения процесса
+        self._connections: set[Connection] = set()
+        # Рассылка между процессами, сообщения доставляются через deliver
+        self.broker = broker_factory(self.deliver)
+        # Закодированная история комментариев для подключений к одной задаче
+        self.history = HistoryCache(settings.WEBSOCKET_HISTORY_CACHE_SECONDS)
+        # Не больше одного события typing за окно на пару (задача, пользователь)
+        self.typing = TypingThrottle(
+            settings.WEBSOCKET_TYPING_WINDOW_SECONDS,
+            settings.WEBSOCKET_TYPING_IDLE_SECONDS,
+            on_stop=self.broadcast_typing_stopped,
+        )
+        # Пакеты событий задачи для соединений, запросивших batching
+        self.batcher = EventBatcher(
+            settings.WEBSOCKET_BATCH_WINDOW_SECONDS,
+            settings.WEBSOCKET_BATCH_MAX_EVENTS,
+            flush=self.flush_batch,
+        )
+        self._sweeper: asyncio.Task | None = None
+        self._heartbeat: asyncio.Task | None = None
+        # Счетчики для метрик: подключения, отключения по причинам и
+        # отброшенные сообщения уже закрытых соединений
+        self.connects = 0
+        self.disconnects: Counter[str] = Counter()
+        self.dropped_closed = 0
+
+    async def start(self):
+        await self.broker.start()
+        user_cache.publish = self.publish_user_invalidation
+        self._sweeper = asyncio.create_task(self._sweep_forever())
+        self._heartbeat = asyncio.create_task(self._heartbeat_forever())
+
+    async def stop(self):
+        for background in (self._sweeper, self._heartbeat):
+            if background:
+                background.cancel()
+        self.typing.shutdown()
+        user_cache.publish = None
+        await self.broker.stop()
+
+    async def connect(
+        self, websocket: WebSocket, user_id: int, batching: bool = False
+    ) -> Connection:
+        """Принимает соединение пользователя, на задачи оно подписывается через
+        subscribe"""
+        # Кодек выбирается по Sec-WebSocket-Protocol, по умолчанию JSON
+        codec = select_codec(websocket.scope.get("subprotocols", []))
+        await websocket.accept(subprotocol=codec.subprotocol)
+        connection = Connection(
+            websocket,
+            user_id,
+            settings.WEBSOCKET_SEND_QUEUE_SIZE,
+            on_close=self._remove,
+            codec=codec,
+        )
+        connection.batching = batching
+        connection.start()
+        self._connections.add(connection)
+        self.connects += 1
+        return connection
+
+    def subscribe(self, connection: Connection, task_id: int) -> bool:
+        """Подписывает соединение на события задачи, False - если соединение уже
+        закрыто"""
+        if connection.closed:
+            return False
+        connection.task_ids.add(task_id)
+        self.active_connections.setdefault(task_id, {}).setdefault(
+            connection.user_id, set()
+        ).add(connection)
+        return True
 
-    async def connect(self, websocket: WebSocket, task_id: int, user_id: int):
-        await websocket.accept()
-        if task_id not in self.active_connections:
-            self.active_connections[task_id] = {}
-        self.active_connections[task_id][user_id] = websocket
+    def unsubscribe(self, connection: Connection, task_id: int):
+        """Отписывает соединение от событий задачи"""
+        connection.task_ids.discard(task_id)
+        task_connections = self.active_connections.get(task_id)
+        if not task_connections:
+            return
+        user_connections = task_connections.get(connection.user_id)
+        if not user_connections:
+            return
+        user_connections.discard(connection)
+        if not user_connections:
+            del task_connections[connection.user_id]
+        if not task_connections:
+            del self.active_connections[task_id]
+
+    def disconnect(self, connection: Connection, reason: str = "client"):
+        """Убирает соединение из реестра, когда клиент отключился"""
+        connection.stop(reason)
+
+    def _remove(self, connection: Connection):
+        """Удаляет закрытое соединение из реестра, вызывается самим соединением"""
+        if connection not in self._connections:
+            return
+        self._connections.discard(connection)
+        for task_id in list(connection.task_ids):
+            self.unsubscribe(connection, task_id)
+        self.dropped_closed += connection.dropped
+        self.disconnects[connection.close_reason or "client"] += 1
+
+    def connections(self) -> list[Connection]:
+        """Все соединения этого процесса"""
+        return list(self._connections)
+
+    async def sweep(self) -> int:
+        """Закрывает полуоткрытые соединения, возвращает их количество"""
+        stale = [
+            connection
+            for connection in self.connections()
+            if connection.is_stale(settings.WEBSOCKET_STALE_SECONDS)
+        ]
+        for connection in stale:
+            await connection.close(status.WS_1011_INTERNAL_ERROR, "stale")
+            # Соединение, закрытое раньше, могло не попасть в _remove
+            self._remove(connection)
+        return len(stale)
+
+    async def _sweep_forever(self):
+        while True:
+            await asyncio.sleep(settings.WEBSOCKET_SWEEP_INTERVAL_SECONDS)
+            try:
+                reaped = await self.sweep()
+                if reaped:
+                    logger.info("Reaped %s stale websocket connections", reaped)
+            except Exception:
+                logger.exception("Websocket sweep failed")
+
+    async def heartbeat(self) -> int:
+        """
+        Отправляет ping молчащим соединениям и закрывает не ответившие на ping
+        и простаивающие, возвращает количество закрытых
+        """
+        evicted = 0
+        for connection in self.connections():
+            if connection.is_unresponsive(settings.WEBSOCKET_PING_TIMEOUT_SECONDS):
+                await connection.close(status.WS_1001_GOING_AWAY, "ping_timeout")
+                evicted += 1
+            elif connection.is_idle(settings.WEBSOCKET_IDLE_TIMEOUT_SECONDS):
+                await connection.close(status.WS_1001_GOING_AWAY, "idle")
+                evicted += 1
+            elif connection.needs_ping(settings.WEBSOCKET_PING_INTERVAL_SECONDS):
+                connection.ping()
+        return evicted
+
+    async def _heartbeat_forever(self):
+        # Проверка чаще интервалов, чтобы таймауты срабатывали без большого опоздания
+        period = (
+            min(
+                settings.WEBSOCKET_PING_INTERVAL_SECONDS,
+                settings.WEBSOCKET_PING_TIMEOUT_SECONDS,
+            )
+            / 2
+        )
+        while True:
+            await asyncio.sleep(period)
+            try:
+                evicted = await self.heartbeat()
+                if evicted:
+                    logger.info(
+                        "Evicted %s unresponsive or idle websocket connections", evicted
+                    )
+            except Exception:
+                logger.exception("Websocket heartbeat failed")
+
+    def stats(self) -> dict:
+        """
+        Живые соединения и подписки по задачам, память очередей отправки,
+        отброшенные сообщения, подключения и отключения по причинам
+        """
+        connections = self.connections()
+        return {
+            "tasks": len(self.active_connections),
+            "users": len({connection.user_id for connection in connections}),
+            "connections": len(connections),
+            "subscriptions": sum(
+                len(connection.task_ids) for connection in connections
+            ),
+            "queued": sum(connection.queue_depth for connection in connections),
+            "queued_bytes": sum(connection.queued_bytes for connection in connections),
+            "max_queue_depth": max(
+                (connection.queue_depth for connection in connections), default=0
+            ),
+            "dropped": self.dropped_closed
+            + sum(connection.dropped for connection in connections),
+            "connects": self.connects,
+            "disconnects": dict(self.disconnects),
+            "connections_per_task": {
+                task_id: sum(
+                    len(user_connections)
+                    for user_connections in task_connections.values()
+                )
+                for task_id, task_connections in self.active_connections.items()
+            },
+            **self.typing.stats(),
+            **self.batcher.stats(),
+        }
 
-    def disconnect(self, task_id: int, user_id: int):
-        if task_id in self.active_connections:
-            if user_id in self.active_connections[task_id]:
-                del self.active_connections[task_id][user_id]
-            if not self.active_connections[task_id]:
-                del self.active_connections[task_id]
+    async def broadcast_typing_stopped(self, task_id: int, user_id: int, username: str):
+        """Сообщает участникам задачи, что пользователь перестал печатать"""
+        await self.broadcast(
+            message={
+                "type": "typing_stopped",
+                "user_id": user_id,
+                "username": username,
+            },
+            task_id=task_id,
+            exclude_user_id=user_id,
+        )
 
     async def broadcast(self, message: dict, task_id: int, exclude_user_id: int = None):
-        """Отправляет сообщение всем подключенным к задаче пользователям"""
+        """Отправляет сообщение всем подключенным к задаче пользователям во всех
+        процессах"""
+        # По task_id клиент с подпиской на несколько задач различает их события
+        await self.broker.publish(
+            task_id, {**message, "task_id": task_id}, exclude_user_id
+        )
+
+    async def publish_user_invalidation(self, user_id: int):
+        """Сбрасывает пользователя в кэшах аутентификации всех процессов"""
+        await self.broker.publish(0, {"type": USER_INVALIDATED, "user_id": user_id})
+
+    async def deliver(self, task_id: int, message: dict, exclude_user_id: int = None):
+        """Отправляет сообщение подключенным к задаче пользователям этого процесса"""
+        if message.get("type") == USER_INVALIDATED:
+            user_cache.discard(message["user_id"])
+            return
+        if message.get("type") in HISTORY_CHANGING_TYPES:
+            self.history.invalidate(task_id)
         if task_id in self.active_connections:
-            recipient_count = 0
-            for user_id, websocket in self.active_connections[task_id].items():
+            # Сообщение кодируется один раз на кодек, в очереди соединений
+            # кладется готовый кадр
+            encoded = EncodedMessage(message)
+            droppable = message.get("type") in DROPPABLE_TYPES
+            # Для соединений в режиме batching событие откладывается,
+            # если окно задачи открыто
+            batched = any(
+                connection.batching
+                for user_connections in self.active_connections[task_id].values()
+                for connection in user_connections
+            ) and self.batcher.add(
+                task_id, BatchedEvent(encoded, droppable, exclude_user_id)
+            )
+            # Копия: соединение с ошибкой записи удаляется из реестра во время обхода
+            for user_id, user_connections in list(
+                self.active_connections[task_id].items()
+            ):
                 if exclude_user_id is None or user_id != exclude_user_id:
-                    try:
-                        await websocket.send_json(message)
-                        recipient_count += 1
-                    except Exception as e:
-                        pass
+                    for connection in list(user_connections):
+                        if batched and connection.batching:
+                            continue
+                        connection.send_frame(
+                            encoded.frame(connection.codec), droppable
+                        )
+
+    def flush_batch(self, task_id: int, events: list[BatchedEvent]):
+        """Отправляет накопленные события задачи одним кадром соединениям в режиме
+        batching"""
+        # Пакет собирается из готовых кадров, пользователи с одинаковым набором
+        # событий получают один кадр
+        frames: dict[tuple[tuple[int, ...], Codec], bytes | str] = {}
+        for user_id, user_connections in list(
+            self.active_connections.get(task_id, {}).items()
+        ):
+            visible = tuple(
+                index
+                for index, event in enumerate(events)
+                if event.exclude_user_id != user_id
+            )
+            if not visible:
+                continue
+            droppable = all(events[index].droppable for index in visible)
+            for connection in list(user_connections):
+                if not connection.batching:
+                    continue
+                key = (visible, connection.codec)
+                if key not in frames:
+                    frames[key] = connection.codec.encode_batch(
+                        [
+                            events[index].message.frame(connection.codec)
+                            for index in visible
+                        ]
+                    )
+                connection.send_frame(frames[key], droppable)
 
 
 manager = ConnectionManager()
@@ -50,53 +329,40 @@ async def handle_comment(data: dict, task_id: int, user_id: int, db: AsyncSessio
             text=data.get("text", ""),
             author_id=user_id,
             mention_ids=data.get("mention_ids", []),
-            is_edited=False
+            is_edited=False,
         )
 
         db_comment = await crud_comment.create(db=db, obj_in=comment_in)
 
-        comment_data = {
-            "id": db_comment.id,
-            "task_id": db_comment.task_id,
-            "author_id": db_comment.author_id,
-            "author": {
-                "id": db_comment.author.id,
-                "username": db_comment.author.username
-            },
-            "text": db_comment.text,
-            "attachment_path": db_comment.attachment_path,
-            "created_at": db_comment.created_at.isoformat(),
-            "updated_at": db_comment.updated_at.isoformat(),
-            "mentions": [
-                {"id": mention.user.id, "username": mention.user.username}
-                for mention in db_comment.mentions
-            ],
-            "is_edited": db_comment.is_edited,
-        }
+        comment_data = comment_to_dict(db_comment)
 
         await manager.broadcast(
-            message={"type": "new_comment", "data": comment_data},
-            task_id=task_id
+            message={"type": "new_comment", "data": comment_data}, task_id=task_id
         )
 
+        # Комментарий отправлен, индикатор набора больше не нужен
+        if manager.typing.stop(task_id, user_id):
+            await manager.broadcast_typing_stopped(
+                task_id, user_id, db_comment.author.username
+            )
+
         return comment_data
     except Exception as e:
         import traceback
+
         traceback.print_exc()
         return {"type": "error", "message": str(e)}
 
 
 async def handle_typing(task_id: int, user_id: int, username: str):
-    """Обрабатывает уведомление о печати"""
+    """Обрабатывает уведомление о печати, лишние события в пределах окна подавляются"""
     try:
+        if not manager.typing.hit(task_id, user_id, username):
+            return True
         await manager.broadcast(
-            message={
-                "type": "typing",
-                "user_id": user_id,
-                "username": username
-            },
+            message={"type": "typing", "user_id": user_id, "username": username},
             task_id=task_id,
-            exclude_user_id=user_id
+            exclude_user_id=user_id,
         )
         return True
     except Exception as e:
@@ -114,57 +380,45 @@ async def handle_edit_comment(data: dict, task_id: int, user_id: int, db: AsyncS
 
         # Получаем комментарий из БД
         db_comment = await crud_comment.get(db=db, id=comment_id)
-        if not db_comment:
+        if not db_comment or db_comment.task_id != task_id:
             return {"type": "error", "message": "Comment not found"}
 
         # Проверяем права на редактирование
         if db_comment.author_id != user_id and not (await is_admin(db, user_id)):
-            return {"type": "error", "message": "You don't have permission to edit this comment"}
+            return {
+                "type": "error",
+                "message": "You don't have permission to edit this comment",
+            }
 
         # Обновляем комментарий
         comment_update = CommentUpdate(
-            text=text,
-            mention_ids=mention_ids,
-            is_edited=True
+            text=text, mention_ids=mention_ids, is_edited=True
+        )
+        updated_comment = await crud_comment.update(
+            db=db, db_obj=db_comment, obj_in=comment_update
         )
-        updated_comment = await crud_comment.update(db=db, db_obj=db_comment, obj_in=comment_update)
 
         # Готовим данные для отправки клиентам
-        comment_data = {
-            "id": updated_comment.id,
-            "task_id": updated_comment.task_id,
-            "author_id": updated_comment.author_id,
-            "author": {
-                "id": updated_comment.author.id,
-                "username": updated_comment.author.username
-            },
-            "text": updated_comment.text,
-            "attachment_path": updated_comment.attachment_path,
-            "created_at": updated_comment.created_at.isoformat(),
-            "updated_at": updated_comment.updated_at.isoformat(),
-            "mentions": [
-                {"id": mention.user.id, "username": mention.user.username}
-                for mention in updated_comment.mentions
-            ],
-            "is_edited": updated_comment.is_edited,
-        }
+        comment_data = comment_to_dict(updated_comment)
 
         # Отправляем всем участникам
         await manager.broadcast(
-            message={"type": "edit_comment", "data": comment_data},
-            task_id=task_id
+            message={"type": "edit_comment", "data": comment_data}, task_id=task_id
         )
 
         return comment_data
 
     except Exception as e:
         import traceback
+
         print(f"Error editing comment: {str(e)}")
         traceback.print_exc()
         return {"type": "error", "message": str(e)}
 
 
-async def handle_delete_comment(data: dict, task_id: int, user_id: int, db: AsyncSession):
+async def handle_delete_comment(
+    data: dict, task_id: int, user_id: int, db: AsyncSession
+):
     """Обрабатывает удаление комментария"""
     try:
         comment_id = data.get("comment_id")
@@ -172,12 +426,15 @@ async def handle_delete_comment(data: dict, task_id: int, user_id: int, db: Asyn
 
         # Получаем комментарий из БД
         db_comment = await crud_comment.get(db=db, id=comment_id)
-        if not db_comment:
+        if not db_comment or db_comment.task_id != task_id:
             return {"type": "error", "message": "Comment not found"}
 
         # Проверяем права на удаление
         if db_comment.author_id != user_id and not (await is_admin(db, user_id)):
-            return {"type": "error", "message": "You don't have permission to delete this comment"}
+            return {
+                "type": "error",
+                "message": "You don't have permission to delete this comment",
+            }
 
         # Удаляем комментарий
         await crud_comment.remove(db=db, id=comment_id)
@@ -185,13 +442,14 @@ async def handle_delete_comment(data: dict, task_id: int, user_id: int, db: Asyn
         # Отправляем всем участникам
         await manager.broadcast(
             message={"type": "delete_comment", "data": {"comment_id": comment_id}},
-            task_id=task_id
+            task_id=task_id,
         )
 
         return {"success": True, "comment_id": comment_id}
 
     except Exception as e:
         import traceback
+
         print(f"Error deleting comment: {str(e)}")
         traceback.print_exc()
         return {"type": "error", "message": str(e)}
@@ -200,102 +458,304 @@ async def handle_delete_comment(data: dict, task_id: int, user_id: int, db: Asyn
 async def is_admin(db: AsyncSession, user_id: int) -> bool:
     """Проверяет, является ли пользователь администратором"""
     from app.crud import user as crud_user
+
     user = await crud_user.get(db=db, id=user_id)
     return user and user.is_superuser
 
 
-async def task_comments_websocket(
-        websocket: WebSocket,
-        task_id: int,
-        token: str = None,
-        db: AsyncSession = Depends(get_db)
-):
-    """WebSocket эндпоинт для комментариев к задаче"""
-
+def comment_to_dict(comment) -> dict:
+    """Данные комментария для отправки клиентам"""
+    return {
+        "id": comment.id,
+        "task_id": comment.task_id,
+        "author_id": comment.author_id,
+        "author": {"id": comment.author.id, "username": comment.author.username},
+        "text": comment.text,
+        "attachment_path": comment.attachment_path,
+        "created_at": comment.created_at.isoformat(),
+        "updated_at": comment.updated_at.isoformat(),
+        "mentions": [
+            {"id": mention.user.id, "username": mention.user.username}
+            for mention in comment.mentions
+        ],
+        "is_edited": comment.is_edited,
+    }
+
+
+async def load_history(
+    db: AsyncSession,
+    task_id: int,
+    message_type: str = "history",
+    since_id: int = None,
+    before_id: int = None,
+) -> dict:
+    """
+    Загружает страницу истории комментариев задачи, начиная с самых новых.
+    has_more означает, что в тех же границах есть более старые комментарии,
+    их клиент запрашивает сообщением load_more с before_id.
+    """
+    comments, has_more = await crud_comment.get_page_by_task(
+        db=db,
+        task_id=task_id,
+        limit=settings.WEBSOCKET_HISTORY_PAGE_SIZE,
+        since_id=since_id,
+        before_id=before_id,
+    )
+    return {
+        "type": message_type,
+        "task_id": task_id,
+        "data": [comment_to_dict(comment) for comment in comments],
+        "since_id": since_id,
+        "before_id": before_id,
+        "has_more": has_more,
+    }
+
+
+async def load_history_in_session(task_id: int, since_id: int = None) -> dict:
+    """Загружает историю комментариев в отдельной короткой сессии"""
+    async with AsyncSessionLocal() as db:
+        return await load_history(db, task_id, since_id=since_id)
+
+
+async def handle_load_more(data: dict, task_id: int, db: AsyncSession):
+    """Обрабатывает запрос более старой страницы истории"""
+    try:
+        before_id = int(data["before_id"])
+        since_id = data.get("since_id")
+        since_id = int(since_id) if since_id is not None else None
+    except (KeyError, TypeError, ValueError):
+        return {"type": "error", "message": "load_more requires integer before_id"}
+    return await load_history(
+        db, task_id, "history_page", since_id=since_id, before_id=before_id
+    )
+
+
+async def can_access_task(db: AsyncSession, current_user: User, task_id: int) -> bool:
+    """
+    Проверка доступа к задаче как в check_task_permissions, но одним запросом
+    без загрузки задачи и связанных объектов
+    """
+    has_access = await task.has_access(db, id=task_id, user_id=current_user.id)
+    return has_access is not None and (has_access or current_user.is_superuser)
+
+
+async def authenticate(websocket: WebSocket, token: str = None) -> User | None:
+    """Пользователь по токену, если токена нет - соединение закрывается"""
     if not token:
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
-        return
+        return None
 
-    current_user = await get_current_user(db, token)
+    async with AsyncSessionLocal() as db:
+        current_user = await get_current_user(db, token)
     if not current_user:
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+    return current_user
+
+
+async def send_history(connection: Connection, task_id: int, since_id: int = None):
+    """Отправляет историю комментариев, первая страница без курсора общая для всех"""
+    if since_id is None:
+        history = await manager.history.get(
+            task_id, lambda: load_history_in_session(task_id)
+        )
+        connection.send_frame(history.frame(connection.codec))
+    else:
+        connection.send(await load_history_in_session(task_id, since_id=since_id))
+
+
+async def handle_task_message(
+    connection: Connection, current_user: User, task_id: int, data: dict
+):
+    """Обрабатывает сообщение клиента о задаче, на которую подписано соединение"""
+    message_type = data.get("type")
+    if message_type == "typing":
+        await handle_typing(task_id, current_user.id, current_user.username)
         return
 
-    try:
-        db_task = await task.get(db, id=task_id)
-        if not db_task:
-            raise Exception("Task not found")
+    # Сессия на время обработки одного сообщения
+    async with AsyncSessionLocal() as db:
+        if message_type == "load_more":
+            result = await handle_load_more(data, task_id, db)
+        elif message_type == "edit_comment":
+            result = await handle_edit_comment(data, task_id, current_user.id, db)
+        elif message_type == "delete_comment":
+            result = await handle_delete_comment(data, task_id, current_user.id, db)
+        else:
+            # По умолчанию считаем, что это новый комментарий
+            result = await handle_comment(data, task_id, current_user.id, db)
 
-        await check_task_permissions(db_task=db_task, current_user=current_user)
-    except Exception as e:
+    # Отправителю нужны только страница истории и ошибки, остальное придет рассылкой
+    if "type" in result:
+        connection.send({**result, "task_id": task_id})
+
+
+async def handle_heartbeat(connection: Connection, message_type: str):
+    """Отвечает на ping клиента, pong только отмечает соединение живым"""
+    if message_type == "ping":
+        connection.send({"type": "pong"})
+
+
+async def task_comments_websocket(
+    websocket: WebSocket,
+    task_id: int,
+    token: str = None,
+    since_id: int = None,
+    batch: bool = False,
+):
+    """
+    WebSocket эндпоинт для комментариев к задаче.
+    since_id - ID последнего комментария, который уже есть у клиента: при
+    переподключении отправляются только более новые комментарии.
+    batch - клиент принимает события задачи пакетами {"type": "batch", "events": [...]}
+    не чаще одного кадра за WEBSOCKET_BATCH_WINDOW_SECONDS.
+
+    Соединение не держит сессию базы данных: проверка доступа, загрузка
+    истории и каждое входящее сообщение берут короткую сессию из пула и
+    сразу ее возвращают, поэтому число открытых сокетов не ограничено пулом.
+    """
+    current_user = await authenticate(websocket, token)
+    if not current_user:
+        return
+
+    async with AsyncSessionLocal() as db:
+        allowed = await can_access_task(db, current_user, task_id)
+    if not allowed:
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
         return
 
-    await manager.connect(websocket, task_id, current_user.id)
+    connection = await manager.connect(websocket, current_user.id, batching=batch)
+    manager.subscribe(connection, task_id)
 
     try:
-        # Отправляем историю комментариев
-        comments = await crud_comment.get_by_task(db=db, task_id=task_id)
-        comments_data = []
-
-        for comment in comments:
-            comment_item = {
-                "id": comment.id,
-                "task_id": comment.task_id,
-                "author_id": comment.author_id,
-                "author": {
-                    "id": comment.author.id,
-                    "username": comment.author.username
-                },
-                "text": comment.text,
-                "attachment_path": comment.attachment_path,
-                "created_at": comment.created_at.isoformat(),
-                "updated_at": comment.updated_at.isoformat(),
-                "mentions": [
-                    {"id": mention.user.id, "username": mention.user.username}
-                    for mention in comment.mentions
-                ],
-                "is_edited": comment.is_edited,
-            }
-            comments_data.append(comment_item)
-
-        await websocket.send_json({
-            "type": "history",
-            "data": comments_data
-        })
+        await send_history(connection, task_id, since_id)
 
         # Обрабатываем новые сообщения
         while True:
-            data = await websocket.receive_json()
+            data = await connection.receive()
             message_type = data.get("type")
+            connection.received(message_type)
 
-            if message_type == "typing":
-                await handle_typing(task_id, current_user.id, current_user.username)
-            elif message_type == "edit_comment":
-                result = await handle_edit_comment(data, task_id, current_user.id, db)
-                if "type" in result and result["type"] == "error":
-                    await websocket.send_json(result)
-            elif message_type == "delete_comment":
-                result = await handle_delete_comment(data, task_id, current_user.id, db)
-                if "type" in result and result["type"] == "error":
-                    await websocket.send_json(result)
+            if message_type in HEARTBEAT_TYPES:
+                await handle_heartbeat(connection, message_type)
             else:
-                # По умолчанию считаем, что это новый комментарий
-                result = await handle_comment(data, task_id, current_user.id, db)
-                if "type" in result and result["type"] == "error":
-                    await websocket.send_json(result)
+                await handle_task_message(connection, current_user, task_id, data)
 
     except WebSocketDisconnect:
-        manager.disconnect(task_id, current_user.id)
+        manager.disconnect(connection)
     except Exception as e:
-        import traceback
-        traceback.print_exc()
-        manager.disconnect(task_id, current_user.id)
+        await handle_server_error(connection, e)
+
+
+async def handle_subscribe(connection: Connection, current_user: User, data: dict):
+    """Проверяет доступ к задаче, подписывает соединение и отправляет историю"""
+    try:
+        task_id = int(data["task_id"])
+        since_id = data.get("since_id")
+        since_id = int(since_id) if since_id is not None else None
+    except (KeyError, TypeError, ValueError):
+        connection.send(
+            {"type": "error", "message": "subscribe requires integer task_id"}
+        )
+        return
+
+    if task_id in connection.task_ids:
+        connection.send({"type": "subscribed", "task_id": task_id})
+        return
+    if len(connection.task_ids) >= settings.WEBSOCKET_MAX_SUBSCRIPTIONS:
+        connection.send(
+            {"type": "error", "task_id": task_id, "message": "Too many subscriptions"}
+        )
+        return
 
-        try:
-            await websocket.send_json({
+    async with AsyncSessionLocal() as db:
+        allowed = await can_access_task(db, current_user, task_id)
+    if not allowed:
+        connection.send(
+            {
                 "type": "error",
-                "message": f"Server error: {str(e)}"
-            })
-        except:
-            pass
+                "task_id": task_id,
+                "message": "Not enough permissions to access this task",
+            }
+        )
+        return
+
+    if manager.subscribe(connection, task_id):
+        connection.send({"type": "subscribed", "task_id": task_id})
+        await send_history(connection, task_id, since_id)
+
+
+def handle_unsubscribe(connection: Connection, data: dict):
+    """Отписывает соединение от задачи"""
+    try:
+        task_id = int(data["task_id"])
+    except (KeyError, TypeError, ValueError):
+        connection.send(
+            {"type": "error", "message": "unsubscribe requires integer task_id"}
+        )
+        return
+    manager.unsubscribe(connection, task_id)
+    connection.send({"type": "unsubscribed", "task_id": task_id})
+
+
+async def user_websocket(websocket: WebSocket, token: str = None, batch: bool = False):
+    """
+    Общий WebSocket пользователя для событий нескольких задач.
+
+    Пользователь аутентифицируется один раз на соединение, а на задачи
+    подписывается сообщениями {"type": "subscribe", "task_id": ..., "since_id": ...}
+    и {"type": "unsubscribe", "task_id": ...}. Доступ проверяется для каждой
+    подписки, после подписки отправляется история задачи. Остальные сообщения
+    те же, что у task_comments_websocket, но содержат task_id задачи, на
+    которую подписано соединение, и все сообщения сервера о задаче тоже
+    содержат task_id.
+    """
+    current_user = await authenticate(websocket, token)
+    if not current_user:
+        return
+
+    connection = await manager.connect(websocket, current_user.id, batching=batch)
+
+    try:
+        while True:
+            data = await connection.receive()
+            message_type = data.get("type")
+            connection.received(message_type)
+
+            if message_type in HEARTBEAT_TYPES:
+                await handle_heartbeat(connection, message_type)
+            elif message_type == "subscribe":
+                await handle_subscribe(connection, current_user, data)
+            elif message_type == "unsubscribe":
+                handle_unsubscribe(connection, data)
+            else:
+                task_id = data.get("task_id")
+                if task_id not in connection.task_ids:
+                    connection.send(
+                        {
+                            "type": "error",
+                            "task_id": task_id,
+                            "message": "Not subscribed to task",
+                        }
+                    )
+                    continue
+                await handle_task_message(connection, current_user, task_id, data)
+
+    except WebSocketDisconnect:
+        manager.disconnect(connection)
+    except Exception as e:
+        await handle_server_error(connection, e)
+
+
+async def handle_server_error(connection: Connection, error: Exception):
+    """Закрывает соединение после непредвиденной ошибки и сообщает о ней клиенту"""
+    import traceback
+
+    traceback.print_exc()
+    manager.disconnect(connection, "error")
+
+    try:
+        await connection.send_now(
+            {"type": "error", "message": f"Server error: {str(error)}"}
+        )
+    except:
+        pass
@@ -0,0 +1,133 @@
+import json
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Sequence, Union
+
+import msgpack
+
+# Текстовый кадр JSON или бинарный кадр MessagePack
+Frame = Union[str, bytes]
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MILLISECOND = timedelta(milliseconds=1)
+
+
+class Codec(ABC):
+    """Кодирование сообщений WebSocket в кадры и разбор входящих кадров"""
+
+    # Значение Sec-WebSocket-Protocol, None - кодек по умолчанию без подпротокола
+    subprotocol: Optional[str] = None
+
+    @abstractmethod
+    def encode(self, message: dict) -> Frame:
+        """Кадр для отправки сообщения"""
+
+    @abstractmethod
+    def encode_batch(self, frames: Sequence[Frame]) -> Frame:
+        """Пакетный кадр {"type": "batch", "events": [...]} из готовых кадров"""
+
+    @abstractmethod
+    def decode(self, data: Frame) -> dict:
+        """Сообщение из входящего кадра"""
+
+
+class JsonCodec(Codec):
+    """JSON в текстовых кадрах, как WebSocket.send_json"""
+
+    def encode(self, message: dict) -> str:
+        return json.dumps(message, separators=(",", ":"))
+
+    def encode_batch(self, frames: Sequence[str]) -> str:
+        return '{"type":"batch","events":[' + ",".join(frames) + "]}"
+
+    def decode(self, data: Frame) -> dict:
+        return json.loads(data)
+
+
+class MsgpackCodec(Codec):
+    """
+    MessagePack в бинарных кадрах, подпротокол taskflow.msgpack.v1.
+
+    Типы и поля сообщений те же, что в JSON, но временные метки (строки
+    ISO 8601 в полях *_at) передаются целым числом миллисекунд Unix time.
+    """
+
+    subprotocol = "taskflow.msgpack.v1"
+
+    def __init__(self):
+        # Словарь из двух ключей без последнего байта - заголовка пустого массива
+        self._batch_prefix = msgpack.packb({"type": "batch", "events": []})[:-1]
+        self._packer = msgpack.Packer()
+
+    def encode(self, message: dict) -> bytes:
+        return msgpack.packb(_with_integer_timestamps(message))
+
+    def encode_batch(self, frames: Sequence[bytes]) -> bytes:
+        return (
+            self._batch_prefix
+            + self._packer.pack_array_header(len(frames))
+            + b"".join(frames)
+        )
+
+    def decode(self, data: Frame) -> dict:
+        if isinstance(data, str):
+            raise ValueError("Expected binary MessagePack frame")
+        return msgpack.unpackb(data)
+
+
+def _timestamp_ms(value: str) -> int:
+    """Миллисекунды Unix time для строки ISO 8601, время без зоны считается UTC"""
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return (moment - _EPOCH) // _MILLISECOND
+
+
+def _with_integer_timestamps(value: Any) -> Any:
+    """Копия сообщения, в которой строки полей *_at заменены миллисекундами"""
+    if isinstance(value, dict):
+        return {
+            key: (
+                _timestamp_ms(item)
+                if key.endswith("_at") and isinstance(item, str)
+                else _with_integer_timestamps(item)
+            )
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_with_integer_timestamps(item) for item in value]
+    return value
+
+
+JSON_CODEC = JsonCodec()
+
+# Кодеки, доступные через Sec-WebSocket-Protocol
+CODECS: Dict[str, Codec] = {MsgpackCodec.subprotocol: MsgpackCodec()}
+
+
+def select_codec(subprotocols: Sequence[str]) -> Codec:
+    """Первый поддерживаемый подпротокол из предложенных клиентом, иначе JSON"""
+    for subprotocol in subprotocols:
+        if subprotocol in CODECS:
+            return CODECS[subprotocol]
+    return JSON_CODEC
+
+
+class EncodedMessage:
+    """
+    Сообщение для рассылки, которое кодируется не больше одного раза для
+    каждого кодека получателей
+    """
+
+    __slots__ = ("message", "_frames")
+
+    def __init__(self, message: dict):
+        self.message = message
+        self._frames: Dict[Codec, Frame] = {}
+
+    def frame(self, codec: Codec) -> Frame:
+        """Кадр сообщения для кодека"""
+        frame = self._frames.get(codec)
+        if frame is None:
+            frame = self._frames[codec] = codec.encode(self.message)
+        return frame
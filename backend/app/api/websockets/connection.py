@@ -0,0 +1,274 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Callable, Deque, Optional, Set, Tuple
+
+from fastapi import WebSocket, WebSocketDisconnect, status
+from starlette.websockets import WebSocketState
+
+from app.api.websockets.codecs import JSON_CODEC, Codec, Frame
+
+logger = logging.getLogger(__name__)
+
+# Типы сообщений, которые можно потерять без вреда для клиента
+DROPPABLE_TYPES = frozenset({"typing"})
+
+# Служебные сообщения проверки связи, не считаются активностью клиента
+HEARTBEAT_TYPES = frozenset({"ping", "pong"})
+
+
+def _frame_size(frame: Frame) -> int:
+    """Размер кадра в байтах, JSON кодируется только с не-ASCII символами"""
+    if isinstance(frame, bytes) or frame.isascii():
+        return len(frame)
+    return len(frame.encode())
+
+
+class Connection:
+    """
+    WebSocket соединение с ограниченной очередью исходящих сообщений.
+    Соединение подписано на события одной или нескольких задач (task_ids).
+
+    Сообщения кодируются кодеком, согласованным через подпротокол при
+    подключении. Отправка только кладет закодированный кадр в очередь, а в сокет
+    его пишет отдельная задача соединения, поэтому медленный клиент не задерживает
+    остальных получателей и обработчик отправителя. Политика для медленного
+    клиента:
+    при заполнении очереди наполовину отбрасываются сообщения DROPPABLE_TYPES,
+    при полной очереди соединение закрывается с кодом 1013.
+
+    При любом закрытии соединения, в том числе после ошибки записи, один раз
+    вызывается on_close, чтобы реестр сразу перестал рассылать в этот сокет.
+    Причина закрытия сохраняется в close_reason для метрик.
+
+    Соединение запоминает время последнего сообщения клиента и последнего
+    сообщения, кроме pong, по ним реестр отправляет ping и закрывает
+    не отвечающие и простаивающие сокеты.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        user_id: int,
+        max_queue: int,
+        on_close: Optional[Callable[["Connection"], None]] = None,
+        codec: Codec = JSON_CODEC,
+    ):
+        """
+        Args:
+            websocket: Принятое WebSocket соединение
+            user_id: ID пользователя
+            max_queue: Максимальное число сообщений в очереди
+            on_close: Вызывается один раз после закрытия соединения
+            codec: Кодек кадров соединения
+        """
+        self.websocket = websocket
+        self.user_id = user_id
+        # ID задач, на события которых подписано соединение
+        self.task_ids: Set[int] = set()
+        self.max_queue = max_queue
+        self.codec = codec
+        self.dropped = 0
+        self.queued_bytes = 0
+        self.closed = False
+        self.close_code: Optional[int] = None
+        self.close_reason: Optional[str] = None
+        # Клиент принимает события задачи пакетами
+        self.batching = False
+        now = time.monotonic()
+        # Время последней завершенной записи в сокет
+        self.last_write_at = now
+        # Время последнего сообщения клиента и последнего сообщения, кроме pong
+        self.last_received_at = now
+        self.last_active_at = now
+        # Время отправки ping, на который еще нет ответа
+        self.ping_sent_at: Optional[float] = None
+        self._on_close = on_close
+        # Кадр, можно ли его отбросить и его размер в байтах
+        self._queue: Deque[Tuple[Frame, bool, int]] = deque()
+        self._ready = asyncio.Event()
+        self._sending = False
+        self._writer: Optional[asyncio.Task] = None
+        # Закрытие при переполнении очереди, ссылка держит задачу до завершения
+        self._close_task: Optional[asyncio.Task] = None
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def is_stale(self, timeout: float) -> bool:
+        """
+        Полуоткрытое соединение: клиент уже отключился или есть что отправить,
+        но запись в сокет не завершалась дольше timeout секунд
+        """
+        if self.closed or self.websocket.client_state == WebSocketState.DISCONNECTED:
+            return True
+        pending = self._sending or bool(self._queue)
+        return pending and time.monotonic() - self.last_write_at > timeout
+
+    def received(self, message_type: Optional[str]) -> None:
+        """Отметка о сообщении клиента, любое сообщение считается ответом на ping"""
+        now = time.monotonic()
+        self.last_received_at = now
+        self.ping_sent_at = None
+        if message_type not in HEARTBEAT_TYPES:
+            self.last_active_at = now
+
+    def needs_ping(self, interval: float) -> bool:
+        """От клиента ничего не приходило interval секунд и ping еще не отправлен"""
+        return (
+            self.ping_sent_at is None
+            and time.monotonic() - self.last_received_at >= interval
+        )
+
+    def ping(self) -> bool:
+        """Постановка ping в очередь"""
+        if not self.send({"type": "ping"}):
+            return False
+        self.ping_sent_at = time.monotonic()
+        return True
+
+    def is_unresponsive(self, timeout: float) -> bool:
+        """Клиент не ответил на ping за timeout секунд"""
+        return (
+            self.ping_sent_at is not None
+            and time.monotonic() - self.ping_sent_at > timeout
+        )
+
+    def is_idle(self, timeout: float) -> bool:
+        """Клиент не присылал ничего, кроме pong, timeout секунд, 0 - без ограничения"""
+        return timeout > 0 and time.monotonic() - self.last_active_at > timeout
+
+    def start(self) -> None:
+        """Запуск задачи записи в сокет"""
+        self._writer = asyncio.create_task(self._write())
+
+    def send(self, message: dict) -> bool:
+        """Кодирование сообщения и постановка в очередь без ожидания"""
+        return self.send_frame(
+            self.codec.encode(message), message.get("type") in DROPPABLE_TYPES
+        )
+
+    async def send_now(self, message: dict) -> None:
+        """Отправка мимо очереди, когда задача записи уже остановлена"""
+        await self._send(self.codec.encode(message))
+
+    async def receive(self) -> dict:
+        """Получение и декодирование сообщения клиента"""
+        message = await self.websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(
+                message.get("code", status.WS_1000_NORMAL_CLOSURE)
+            )
+        data = message.get("bytes")
+        return self.codec.decode(message["text"] if data is None else data)
+
+    def send_frame(self, frame: Frame, droppable: bool = False) -> bool:
+        """
+        Постановка закодированного кадра в очередь без ожидания
+
+        Args:
+            frame: Кадр в формате кодека, один и тот же для всех получателей рассылки
+            droppable: Можно ли отбросить кадр при медленном клиенте
+
+        Returns:
+            False, если соединение закрыто или закрывается из-за переполнения
+        """
+        if self.closed:
+            return False
+        if droppable and len(self._queue) >= self.max_queue // 2:
+            self.dropped += 1
+            return True
+        if len(self._queue) >= self.max_queue and not self._drop_one():
+            if self._close_task is None:
+                logger.warning(
+                    "Slow consumer on tasks %s, user %s: send queue is full",
+                    sorted(self.task_ids),
+                    self.user_id,
+                )
+                self._close_task = asyncio.create_task(
+                    self.close(status.WS_1013_TRY_AGAIN_LATER, "slow_consumer")
+                )
+            return False
+        if not self._sending and not self._queue:
+            # Отсчет зависшей записи начинается с момента появления данных
+            self.last_write_at = time.monotonic()
+        size = _frame_size(frame)
+        self._queue.append((frame, droppable, size))
+        self.queued_bytes += size
+        self._ready.set()
+        return True
+
+    async def close(
+        self, code: int = status.WS_1000_NORMAL_CLOSURE, reason: str = "server"
+    ) -> None:
+        """
+        Закрытие соединения и остановка задачи записи
+
+        Args:
+            code: Код закрытия WebSocket
+            reason: Причина закрытия, передается клиенту и попадает в метрики
+        """
+        if self.closed:
+            return
+        self.close_code = code
+        self.close_reason = reason
+        self._mark_closed()
+        try:
+            await self.websocket.close(code=code, reason=reason)
+        except Exception:
+            pass
+
+    def stop(self, reason: str = "client") -> None:
+        """Остановка задачи записи, когда клиент уже отключился"""
+        if not self.closed:
+            self.close_reason = reason
+            self._mark_closed()
+
+    def _mark_closed(self) -> None:
+        """Очистка очереди, остановка записи и уведомление реестра"""
+        self.closed = True
+        self._queue.clear()
+        self.queued_bytes = 0
+        if self._writer and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        if self._on_close:
+            self._on_close(self)
+
+    def _drop_one(self) -> bool:
+        """Удаление самого старого отбрасываемого сообщения из очереди"""
+        for index, (_, droppable, size) in enumerate(self._queue):
+            if droppable:
+                del self._queue[index]
+                self.queued_bytes -= size
+                self.dropped += 1
+                return True
+        return False
+
+    async def _write(self) -> None:
+        """Последовательная запись сообщений очереди в сокет"""
+        while not self.closed:
+            if not self._queue:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+            frame, _, size = self._queue.popleft()
+            self.queued_bytes -= size
+            self._sending = True
+            try:
+                await self._send(frame)
+            except Exception:
+                # Клиент недоступен, соединение сразу убирается из реестра
+                self.stop("write_error")
+                return
+            finally:
+                self._sending = False
+            self.last_write_at = time.monotonic()
+
+    async def _send(self, frame: Frame) -> None:
+        """Запись кадра: текстового для JSON, бинарного для MessagePack"""
+        if isinstance(frame, bytes):
+            await self.websocket.send_bytes(frame)
+        else:
+            await self.websocket.send_text(frame)
@@ -0,0 +1,77 @@
+import asyncio
+from typing import Awaitable, Callable, Dict
+
+from app.api.websockets.codecs import EncodedMessage
+from app.utils.cache import TTLCache
+
+# Типы сообщений, после которых история комментариев задачи устаревает
+HISTORY_CHANGING_TYPES = frozenset({"new_comment", "edit_comment", "delete_comment"})
+
+
+class HistoryCache:
+    """
+    Кэш сообщений истории комментариев по задачам вместе с их кадрами.
+    Кэшируется только первая страница для клиентов без курсора.
+
+    Когда несколько клиентов подключаются к задаче за короткое время, история
+    загружается один раз и кодируется один раз для каждого кодека:
+    параллельные подключения ждут первое, а следующие в пределах ttl
+    получают готовое сообщение. Кэш сбрасывается
+    сообщениями, меняющими комментарии задачи.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 1024):
+        """
+        Args:
+            ttl: Время жизни сообщения в секундах
+            maxsize: Максимальное количество задач в кэше
+        """
+        self._frames: TTLCache[int, EncodedMessage] = TTLCache(maxsize, ttl)
+        self._versions: Dict[int, int] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+        # Число загрузок задачи, которые держат или ждут блокировку.
+        # Блокировка и версия удаляются, только когда их не осталось
+        self._waiters: Dict[int, int] = {}
+
+    async def get(
+        self, task_id: int, load: Callable[[], Awaitable[dict]]
+    ) -> EncodedMessage:
+        """
+        История задачи из кэша или загруженная через load
+
+        Args:
+            task_id: ID задачи
+            load: Загрузка сообщения с историей комментариев задачи
+        """
+        frame = self._frames.get(task_id)
+        if frame is not None:
+            return frame
+        lock = self._locks.setdefault(task_id, asyncio.Lock())
+        self._waiters[task_id] = self._waiters.get(task_id, 0) + 1
+        try:
+            async with lock:
+                frame = self._frames.get(task_id)
+                if frame is not None:
+                    return frame
+                version = self._versions.get(task_id, 0)
+                frame = EncodedMessage(await load())
+                # Комментарии изменились во время загрузки, кадр не кэшируем
+                if self._versions.get(task_id, 0) == version:
+                    self._frames.set(task_id, frame)
+                return frame
+        finally:
+            # Сразу после release блокировка свободна, даже если ее ждут,
+            # поэтому о последнем ожидающем судим по счетчику, а не по locked()
+            self._waiters[task_id] -= 1
+            if not self._waiters[task_id]:
+                del self._waiters[task_id]
+                del self._locks[task_id]
+                self._versions.pop(task_id, None)
+
+    def invalidate(self, task_id: int) -> None:
+        """Сброс истории задачи после изменения комментариев"""
+        self._frames.discard(task_id)
+        if task_id in self._locks:
+            self._versions[task_id] = self._versions.get(task_id, 0) + 1
+        else:
+            self._versions.pop(task_id, None)
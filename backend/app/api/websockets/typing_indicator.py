@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Рассылка события "перестал печатать": (task_id, user_id, username)
+OnStop = Callable[[int, int, str], Awaitable[None]]
+
+
+class TypingThrottle:
+    """
+    Прореживание событий набора текста по паре (задача, пользователь).
+
+    Клиент присылает typing на каждое нажатие клавиши, а другим участникам
+    пересылается не больше одного события за window секунд. Если от
+    пользователя нет событий idle секунд или он отправил комментарий,
+    участникам один раз рассылается событие остановки набора.
+    """
+
+    def __init__(self, window: float, idle: float, on_stop: OnStop):
+        """
+        Args:
+            window: Минимальный интервал между пересылаемыми событиями
+            idle: Через сколько секунд без событий набор считается остановленным
+            on_stop: Рассылка события остановки набора
+        """
+        self.window = window
+        self.idle = idle
+        self.on_stop = on_stop
+        self.forwarded = 0
+        self.suppressed = 0
+        self.stopped = 0
+        # {(task_id, user_id): (время последнего пересланного события,
+        #                       таймер остановки)}
+        self._typing: Dict[Tuple[int, int], Tuple[float, asyncio.TimerHandle]] = {}
+        # Рассылки остановки набора, ссылки держат задачи до завершения
+        self._pending: Set[asyncio.Task] = set()
+
+    def hit(self, task_id: int, user_id: int, username: str) -> bool:
+        """
+        Регистрация события набора
+
+        Returns:
+            True, если событие нужно переслать участникам
+        """
+        key = (task_id, user_id)
+        now = time.monotonic()
+        forwarded_at: Optional[float] = None
+        if key in self._typing:
+            forwarded_at, timer = self._typing[key]
+            timer.cancel()
+        timer = asyncio.get_running_loop().call_later(
+            self.idle, self._expire, task_id, user_id, username
+        )
+        if forwarded_at is not None and now - forwarded_at < self.window:
+            self._typing[key] = (forwarded_at, timer)
+            self.suppressed += 1
+            return False
+        self._typing[key] = (now, timer)
+        self.forwarded += 1
+        return True
+
+    def stop(self, task_id: int, user_id: int) -> bool:
+        """
+        Сброс набора без рассылки, например после отправки комментария
+
+        Returns:
+            True, если пользователь печатал и участникам нужно сообщить об остановке
+        """
+        state = self._typing.pop((task_id, user_id), None)
+        if state is None:
+            return False
+        state[1].cancel()
+        self.stopped += 1
+        return True
+
+    def shutdown(self) -> None:
+        """Отмена таймеров простоя и незавершенных рассылок при остановке"""
+        for _, timer in self._typing.values():
+            timer.cancel()
+        self._typing.clear()
+        for task in self._pending:
+            task.cancel()
+        self._pending.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Счетчики пересланных, подавленных и остановленных событий"""
+        return {
+            "typing_active": len(self._typing),
+            "typing_forwarded": self.forwarded,
+            "typing_suppressed": self.suppressed,
+            "typing_stopped": self.stopped,
+        }
+
+    def _expire(self, task_id: int, user_id: int, username: str) -> None:
+        """Таймер простоя: пользователь перестал печатать"""
+        if self.stop(task_id, user_id):
+            task = asyncio.create_task(self._notify(task_id, user_id, username))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def _notify(self, task_id: int, user_id: int, username: str) -> None:
+        try:
+            await self.on_stop(task_id, user_id, username)
+        except Exception:
+            logger.exception("Failed to broadcast typing stop")
@@ -1,4 +1,4 @@
-from typing import List, Union
+from typing import List, Literal, Optional, Union
 
 from pydantic import AnyHttpUrl, field_validator
 from pydantic_settings import BaseSettings
@@ -22,6 +22,8 @@ class Settings(BaseSettings):
     # JWT настройки
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 дней
+    # Максимальное число проверенных токенов в кэше decode_token
+    TOKEN_CACHE_MAX_SIZE: int = 4096
 
     # Настройки базы данных
     POSTGRES_HOST: str
@@ -29,6 +31,83 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str
     POSTGRES_DB: str
     POSTGRES_PORT: str = "5432"
+    # Размер пула соединений движка и допустимое превышение
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+
+    # Время жизни кэша статусов задач в памяти процесса (секунды)
+    STATUS_CACHE_TTL_SECONDS: int = 60
+
+    # Кэш пользователей, найденных по JWT токену (записей и секунд жизни).
+    # Изменения пользователя сбрасывают кэш других воркеров через брокер
+    # WEBSOCKET_BROKER=postgres, с брокером memory - только по истечении ttl,
+    # поэтому при нескольких воркерах нужен postgres
+    USER_CACHE_MAX_SIZE: int = 1024
+    USER_CACHE_TTL_SECONDS: int = 30
+
+    # Число потоков для bcrypt, ограничивает одновременные хэширования паролей
+    PASSWORD_HASH_WORKERS: int = 2
+
+    # Схема хэширования паролей passlib и ее стоимость (rounds), None - по умолчанию
+    # схемы. Хэши с другой схемой или стоимостью пересчитываются при следующем входе
+    PASSWORD_HASH_SCHEME: str = "bcrypt"
+    PASSWORD_HASH_ROUNDS: Optional[int] = None
+
+    # Контроль допуска для входа, регистрации и создания пользователей:
+    # одновременных запросов на воркер и запросов за период с IP и для email
+    CREDENTIAL_MAX_CONCURRENT: int = 4
+    CREDENTIAL_RATE_PER_IP: int = 30
+    CREDENTIAL_RATE_PER_EMAIL: int = 10
+    CREDENTIAL_RATE_PERIOD_SECONDS: int = 60
+
+    # Заголовок с IP клиента от доверенного прокси (например, X-Real-IP от nginx).
+    # Учитывается только в запросах с адресов TRUSTED_PROXIES (IP или сети CIDR),
+    # иначе клиент мог бы подставить чужой IP и обойти лимиты входа
+    CLIENT_IP_HEADER: Optional[str] = None
+    TRUSTED_PROXIES: List[str] = []
+
+    # Брокер рассылки WebSocket сообщений: memory - в пределах процесса,
+    # postgres - между воркерами и репликами через LISTEN/NOTIFY
+    WEBSOCKET_BROKER: Literal["memory", "postgres"] = "memory"
+
+    # Размер очереди исходящих сообщений WebSocket соединения. При заполнении
+    # наполовину отбрасываются события typing, при полной очереди соединение закрывается
+    WEBSOCKET_SEND_QUEUE_SIZE: int = 256
+
+    # Сколько секунд закодированная история комментариев задачи отдается
+    # новым подключениям без повторной загрузки
+    WEBSOCKET_HISTORY_CACHE_SECONDS: float = 2.0
+
+    # Количество комментариев в странице истории (history и load_more)
+    WEBSOCKET_HISTORY_PAGE_SIZE: int = 50
+
+    # Пересылается не больше одного события typing за окно на пару
+    # (задача, пользователь), после паузы в наборе участникам один раз
+    # отправляется typing_stopped
+    WEBSOCKET_TYPING_WINDOW_SECONDS: float = 2.0
+    WEBSOCKET_TYPING_IDLE_SECONDS: float = 3.0
+
+    # Периодичность проверки WebSocket соединений и через сколько секунд
+    # зависшей записи соединение считается полуоткрытым и закрывается
+    WEBSOCKET_SWEEP_INTERVAL_SECONDS: float = 30.0
+    WEBSOCKET_STALE_SECONDS: float = 60.0
+
+    # Сервер отправляет ping соединению, от которого ничего не приходило
+    # WEBSOCKET_PING_INTERVAL_SECONDS, и закрывает его, если ответа нет дольше
+    # WEBSOCKET_PING_TIMEOUT_SECONDS. Соединение без сообщений клиента, кроме pong,
+    # закрывается через WEBSOCKET_IDLE_TIMEOUT_SECONDS (0 - не закрывать)
+    WEBSOCKET_PING_INTERVAL_SECONDS: float = 20.0
+    WEBSOCKET_PING_TIMEOUT_SECONDS: float = 20.0
+    WEBSOCKET_IDLE_TIMEOUT_SECONDS: float = 3600.0
+
+    # Соединения, запросившие batching, получают события задачи, пришедшие
+    # в течение окна после первого, одним кадром; пакет отправляется раньше
+    # при MAX_EVENTS событиях
+    WEBSOCKET_BATCH_WINDOW_SECONDS: float = 0.015
+    WEBSOCKET_BATCH_MAX_EVENTS: int = 100
+
+    # Максимальное число подписок на задачи одного соединения /ws
+    WEBSOCKET_MAX_SUBSCRIPTIONS: int = 100
 
     # Формируем строку подключения напрямую
     @property
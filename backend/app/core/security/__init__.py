@@ -1,2 +1,9 @@
-from .jwt import create_access_token, decode_token
-from .password import get_password_hash, verify_password
+from .jwt import create_access_token, decode_token, token_cache
+from .password import (
+    PasswordHasher,
+    get_password_hash,
+    password_hasher,
+    pwd_context,
+    verify_and_update_password,
+    verify_password,
+)
@@ -1,3 +1,5 @@
+import hashlib
+import time
 from datetime import datetime, timedelta
 from typing import Optional, Union
 
@@ -6,6 +8,13 @@ from pydantic import ValidationError
 
 from app.core.config import settings
 from app.schemas import TokenPayload
+from app.utils.cache import TTLCache
+
+# Уже проверенные токены по SHA-256 от токена, запись живет до exp токена
+token_cache: TTLCache[bytes, TokenPayload] = TTLCache(
+    maxsize=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
 
 
 def create_access_token(
@@ -35,7 +44,9 @@ def create_access_token(
 
 def decode_token(token: str) -> Optional[TokenPayload]:
     """
-    Декодирует JWT токен
+    Декодирует JWT токен.
+    Успешно проверенные токены кэшируются до истечения срока действия,
+    недействительные не кэшируются и проверяются каждый раз.
 
     Args:
         token: JWT токен
@@ -43,9 +54,14 @@ def decode_token(token: str) -> Optional[TokenPayload]:
     Returns:
         Данные из токена или None при ошибке декодирования
     """
+    key = hashlib.sha256(token.encode()).digest()
+    token_data = token_cache.get(key)
+    if token_data is not None:
+        return token_data
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
         token_data = TokenPayload(**payload)
-        return token_data
     except (jwt.JWTError, ValidationError):
         return None
+    token_cache.set(key, token_data, ttl=token_data.exp.timestamp() - time.time())
+    return token_data
@@ -1,14 +1,127 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
 from passlib.context import CryptContext
+from passlib.registry import get_crypt_handler
+
+from app.core.config import settings
+
+
+def build_pwd_context(scheme: str, rounds: Optional[int] = None) -> CryptContext:
+    """
+    Создает контекст хэширования паролей
+
+    Args:
+        scheme: Схема passlib для новых хэшей
+        rounds: Стоимость хэширования, None - значение схемы по умолчанию
+
+    Returns:
+        Контекст, который проверяет хэши bcrypt и считает устаревшими хэши
+        с другой схемой или стоимостью
+    """
+    schemes = list(dict.fromkeys([scheme, "bcrypt"]))
+    # Явная стоимость нужна, чтобы needs_update замечал хэши с другими rounds
+    if rounds is None:
+        rounds = getattr(get_crypt_handler(scheme), "default_rounds", None)
+    options = {f"{scheme}__rounds": rounds} if rounds is not None else {}
+    return CryptContext(schemes=schemes, default=scheme, deprecated="auto", **options)
+
 
 # Контекст для хэширования и проверки паролей
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = build_pwd_context(
+    settings.PASSWORD_HASH_SCHEME, settings.PASSWORD_HASH_ROUNDS
+)
+
+ResultType = TypeVar("ResultType")
+
+
+class PasswordHasher:
+    """
+    Пул потоков для хэширования и проверки паролей.
+
+    Один вызов bcrypt занимает сотни миллисекунд CPU и, выполненный прямо в
+    обработчике, останавливает цикл событий вместе со всеми WebSocket
+    соединениями воркера. bcrypt освобождает GIL, поэтому вызовы выполняются
+    в отдельных потоках, а их число ограничено размером пула. Остальные
+    вызовы ждут в очереди, глубина которой доступна в stats().
+    """
 
+    def __init__(self, max_workers: int):
+        """
+        Args:
+            max_workers: Максимальное число одновременных вызовов bcrypt
+        """
+        self.max_workers = max_workers
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.max_queued = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hasher"
+        )
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+    async def run(self, func: Callable[..., ResultType], *args: Any) -> ResultType:
+        """Выполнение функции в пуле без блокировки цикла событий"""
+        with self._lock:
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._call, func, *args)
+
+    def _call(self, func: Callable[..., ResultType], *args: Any) -> ResultType:
+        """Вызов в потоке пула с учетом очереди и выполняющихся вызовов"""
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Глубина очереди и счетчики вызовов для метрик"""
+        return {
+            "max_workers": self.max_workers,
+            "queued": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "max_queued": self.max_queued,
+        }
+
+    def shutdown(self) -> None:
+        """Остановка пула при завершении приложения"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(max_workers=settings.PASSWORD_HASH_WORKERS)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Проверяет соответствие простого пароля хэшу"""
-    return pwd_context.verify(plain_password, hashed_password)
+    return await password_hasher.run(
+        pwd_context.verify, plain_password, hashed_password
+    )
 
 
-def get_password_hash(password: str) -> str:
+async def get_password_hash(password: str) -> str:
     """Создает хэш из пароля"""
-    return pwd_context.hash(password)
+    return await password_hasher.run(pwd_context.hash, password)
+
+
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Проверяет пароль и, если хэш создан с устаревшими параметрами, создает новый
+
+    Returns:
+        Результат проверки и новый хэш или None, если хэш актуален
+    """
+    return await password_hasher.run(
+        pwd_context.verify_and_update, plain_password, hashed_password
+    )
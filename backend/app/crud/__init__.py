@@ -1,4 +1,4 @@
-from .base import CRUDBase
+from .base import CRUDBase, InvalidCursorError, Keyset
 from .crud_comment import comment
 from .crud_status import status
 from .crud_task import task
@@ -1,8 +1,22 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+import base64
+import json
+from datetime import datetime
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import Select, select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db import Base
@@ -12,12 +26,30 @@ ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+# Порядок keyset-пагинации: (колонки сортировки, по убыванию)
+Keyset = Tuple[Tuple[str, ...], bool]
+
+
+class InvalidCursorError(ValueError):
+    """Курсор пагинации поврежден или не соответствует порядку сортировки"""
+
+
+def _keyset_signature(keyset: Keyset) -> str:
+    """Порядок сортировки для курсора, например updated_at,id:desc"""
+    names, descending = keyset
+    return ",".join(names) + (":desc" if descending else ":asc")
+
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     """
     Базовый класс CRUD с основными операциями для работы с моделями.
     """
 
+    # Колонки стабильной сортировки для курсорной (keyset) пагинации.
+    # Последняя колонка должна быть уникальной, чтобы порядок был однозначным.
+    keyset_columns: Tuple[str, ...] = ("id",)
+    keyset_descending: bool = False
+
     def __init__(self, model: Type[ModelType]):
         """
         Инициализация с моделью SQLAlchemy.
@@ -27,6 +59,11 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """
         self.model = model
 
+    @property
+    def keyset(self) -> Keyset:
+        """Порядок сортировки по умолчанию"""
+        return self.keyset_columns, self.keyset_descending
+
     async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
         """
         Получение объекта по ID.
@@ -43,23 +80,163 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         return result.scalars().first()
 
     async def get_multi(
-        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
+        self,
+        db: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[str] = None,
     ) -> List[ModelType]:
         """
         Получение списка объектов с пагинацией.
 
         Args:
             db: Асинхронная сессия SQLAlchemy
-            skip: Сколько объектов пропустить
+            skip: Сколько объектов пропустить (игнорируется, если передан after)
             limit: Максимальное количество объектов
+            after: Курсор, полученный из next_cursor предыдущей страницы
 
         Returns:
             Список объектов модели
         """
-        query = select(self.model).offset(skip).limit(limit)
+        query = self.paginate(select(self.model), skip=skip, limit=limit, after=after)
         result = await db.execute(query)
         return result.scalars().all()
 
+    def paginate(
+        self,
+        query: Select,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[str] = None,
+        keyset: Optional[Keyset] = None,
+    ) -> Select:
+        """
+        Применение стабильной сортировки и пагинации к запросу.
+
+        При переданном курсоре используется keyset-условие по колонкам
+        сортировки, которое обслуживается индексом и не зависит от глубины
+        страницы. Без курсора сохраняется прежнее поведение с OFFSET.
+
+        Args:
+            query: Запрос выборки объектов модели
+            skip: Сколько объектов пропустить
+            limit: Максимальное количество объектов
+            after: Курсор последнего объекта предыдущей страницы
+            keyset: Порядок сортировки, по умолчанию self.keyset
+
+        Returns:
+            Запрос с сортировкой, фильтром по курсору и лимитом
+
+        Raises:
+            InvalidCursorError: Если курсор не удалось разобрать
+        """
+        names, descending = keyset or self.keyset
+        columns = [getattr(self.model, name) for name in names]
+
+        if after is not None:
+            key = tuple_(*columns)
+            values = tuple_(*self.decode_cursor(after, keyset=keyset))
+            if descending:
+                query = query.where(key < values)
+            else:
+                query = query.where(key > values)
+        elif skip:
+            query = query.offset(skip)
+
+        if descending:
+            query = query.order_by(*(column.desc() for column in columns))
+        else:
+            query = query.order_by(*(column.asc() for column in columns))
+
+        return query.limit(limit)
+
+    def encode_cursor(self, obj: ModelType, keyset: Optional[Keyset] = None) -> str:
+        """
+        Формирование непрозрачного курсора по объекту.
+        Вместе со значениями колонок в курсор записывается порядок сортировки,
+        чтобы курсор нельзя было применить к другому порядку.
+
+        Args:
+            obj: Последний объект страницы
+            keyset: Порядок сортировки, по умолчанию self.keyset
+
+        Returns:
+            Строка курсора
+        """
+        keyset = keyset or self.keyset
+        names, _ = keyset
+        values = jsonable_encoder([getattr(obj, name) for name in names])
+        payload = {"s": _keyset_signature(keyset), "v": values}
+        raw = json.dumps(payload, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, cursor: str, keyset: Optional[Keyset] = None) -> List[Any]:
+        """
+        Разбор курсора в значения колонок сортировки.
+
+        Args:
+            cursor: Строка курсора
+            keyset: Порядок сортировки, по умолчанию self.keyset
+
+        Returns:
+            Значения колонок сортировки
+
+        Raises:
+            InvalidCursorError: Если курсор поврежден или выдан для другого
+                порядка сортировки
+        """
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            payload = json.loads(raw)
+        except (ValueError, TypeError) as e:
+            raise InvalidCursorError("Invalid pagination cursor") from e
+
+        keyset = keyset or self.keyset
+        names, _ = keyset
+        if not isinstance(payload, dict):
+            raise InvalidCursorError("Invalid pagination cursor")
+        if payload.get("s") != _keyset_signature(keyset):
+            raise InvalidCursorError("Pagination cursor does not match sort order")
+        values = payload.get("v")
+        if not isinstance(values, list) or len(values) != len(names):
+            raise InvalidCursorError("Invalid pagination cursor")
+
+        decoded = []
+        for name, value in zip(names, values):
+            column = getattr(self.model, name)
+            try:
+                if column.type.python_type is datetime:
+                    value = datetime.fromisoformat(value)
+                else:
+                    value = column.type.python_type(value)
+            except (ValueError, TypeError) as e:
+                raise InvalidCursorError("Invalid pagination cursor") from e
+            decoded.append(value)
+        return decoded
+
+    def next_cursor(
+        self,
+        items: Sequence[ModelType],
+        limit: int,
+        keyset: Optional[Keyset] = None,
+    ) -> Optional[str]:
+        """
+        Курсор следующей страницы или None, если страница последняя.
+
+        Args:
+            items: Объекты текущей страницы
+            limit: Запрошенный размер страницы
+            keyset: Порядок сортировки, по умолчанию self.keyset
+
+        Returns:
+            Строка курсора или None
+        """
+        if not items or len(items) < limit:
+            return None
+        return self.encode_cursor(items[-1], keyset=keyset)
+
     async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
         """
         Создание нового объекта.
@@ -1,4 +1,4 @@
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -23,14 +23,19 @@ class CRUDComment(CRUDBase[Comment, CommentCreate, CommentUpdate]):
         return result.scalars().first()
 
     async def get_multi(
-        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
+        self,
+        db: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[str] = None,
     ) -> List[Comment]:
         """Получение списка комментариев с загрузкой связанных объектов"""
-        query = (
-            select(Comment)
-            .options(selectinload(Comment.author))
-            .offset(skip)
-            .limit(limit)
+        query = self.paginate(
+            select(Comment).options(selectinload(Comment.author)),
+            skip=skip,
+            limit=limit,
+            after=after,
         )
         result = await db.execute(query)
         return result.scalars().all()
@@ -49,6 +54,47 @@ class CRUDComment(CRUDBase[Comment, CommentCreate, CommentUpdate]):
         result = await db.execute(query)
         return result.scalars().all()
 
+    async def get_page_by_task(
+        self,
+        db: AsyncSession,
+        *,
+        task_id: int,
+        limit: int = 50,
+        since_id: Optional[int] = None,
+        before_id: Optional[int] = None,
+    ) -> Tuple[List[Comment], bool]:
+        """
+        Страница комментариев задачи, начиная с самых новых.
+
+        Выборка идет по индексу ix_comment_task_id_id в обратном порядке ID,
+        поэтому не зависит от общего числа комментариев задачи.
+
+        Args:
+            db: Асинхронная сессия SQLAlchemy
+            task_id: ID задачи
+            limit: Максимальное количество комментариев
+            since_id: Только комментарии новее этого ID (уже есть у клиента)
+            before_id: Только комментарии старше этого ID (следующая страница)
+
+        Returns:
+            Комментарии в хронологическом порядке и признак наличия
+            более старых комментариев в заданных границах
+        """
+        query = select(Comment).where(Comment.task_id == task_id)
+        if since_id is not None:
+            query = query.where(Comment.id > since_id)
+        if before_id is not None:
+            query = query.where(Comment.id < before_id)
+        query = (
+            query.options(selectinload(Comment.author), selectinload(Comment.mentions))
+            .order_by(Comment.id.desc())
+            .limit(limit + 1)
+        )
+        result = await db.execute(query)
+        comments = result.scalars().all()
+        has_more = len(comments) > limit
+        return list(reversed(comments[:limit])), has_more
+
     async def create(self, db: AsyncSession, *, obj_in: CommentCreate) -> Comment:
         """Создание нового комментария с упоминаниями пользователей"""
         mention_ids = obj_in.mention_ids or []
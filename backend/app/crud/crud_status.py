@@ -1,11 +1,16 @@
-from typing import Optional
+from typing import Any, Dict, List, Optional, Union
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.crud import CRUDBase
 from app.models import TaskStatus
-from app.schemas import TaskStatusCreate, TaskStatusUpdate
+from app.schemas import (
+    TaskStatus as TaskStatusSchema,
+    TaskStatusCreate,
+    TaskStatusUpdate,
+)
+from app.services import status_registry
 
 
 class CRUDTaskStatus(CRUDBase[TaskStatus, TaskStatusCreate, TaskStatusUpdate]):
@@ -19,5 +24,52 @@ class CRUDTaskStatus(CRUDBase[TaskStatus, TaskStatusCreate, TaskStatusUpdate]):
         result = await db.execute(query)
         return result.scalars().first()
 
+    async def get_cached(self, db: AsyncSession, id: Any) -> Optional[TaskStatusSchema]:
+        """Получение статуса по ID из кэша статусов"""
+        await status_registry.ensure_loaded(db)
+        return status_registry.get(id)
+
+    async def get_multi_cached(
+        self,
+        db: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[str] = None,
+    ) -> List[TaskStatusSchema]:
+        """Получение списка статусов из кэша с той же пагинацией, что и get_multi"""
+        await status_registry.ensure_loaded(db)
+        statuses = status_registry.all()
+        if after is not None:
+            (last_id,) = self.decode_cursor(after)
+            statuses = [item for item in statuses if item.id > last_id]
+        else:
+            statuses = statuses[skip:]
+        return statuses[:limit]
+
+    async def create(self, db: AsyncSession, *, obj_in: TaskStatusCreate) -> TaskStatus:
+        """Создание статуса с обновлением кэша статусов"""
+        db_obj = await super().create(db, obj_in=obj_in)
+        status_registry.put(db_obj)
+        return db_obj
+
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: TaskStatus,
+        obj_in: Union[TaskStatusUpdate, Dict[str, Any]],
+    ) -> TaskStatus:
+        """Обновление статуса с обновлением кэша статусов"""
+        db_obj = await super().update(db, db_obj=db_obj, obj_in=obj_in)
+        status_registry.put(db_obj)
+        return db_obj
+
+    async def remove(self, db: AsyncSession, *, id: int) -> Optional[TaskStatus]:
+        """Удаление статуса с удалением из кэша статусов"""
+        db_obj = await super().remove(db, id=id)
+        status_registry.discard(id)
+        return db_obj
+
 
 status = CRUDTaskStatus(TaskStatus)
@@ -1,144 +1,395 @@
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
-from sqlalchemy import delete, or_, select
+from sqlalchemy import (
+    Row,
+    Select,
+    delete,
+    func,
+    literal_column,
+    or_,
+    select,
+    true,
+    union,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, selectinload
+from sqlalchemy.sql import Subquery
 
-from app.crud import CRUDBase
-from app.models import Task, TaskAssignee, TaskWatcher
-from app.schemas import TaskCreate, TaskUpdate
+from app.crud import CRUDBase, Keyset
+from app.models import Task, TaskAssignee, TaskWatcher, User
+from app.schemas import TaskCreate, TaskFilter, TaskUpdate
+from app.services import status_registry
+
+
+def _task_relations() -> tuple:
+    """
+    Опции загрузки связанных объектов, необходимых для TaskDetail.
+    Статусы берутся из status_registry и отдельно не загружаются.
+    """
+    return (
+        selectinload(Task.creator),
+        selectinload(Task.assignees).options(selectinload(TaskAssignee.user)),
+        selectinload(Task.watchers).options(selectinload(TaskWatcher.user)),
+    )
+
+
+def _task_conditions(filters: TaskFilter) -> List[Any]:
+    """Условия WHERE для параметров фильтрации списка задач"""
+    conditions = []
+    if filters.status_id is not None:
+        conditions.append(Task.status_id == filters.status_id)
+    if filters.creator_id is not None:
+        conditions.append(Task.creator_id == filters.creator_id)
+    if filters.assignee_id is not None:
+        conditions.append(
+            Task.assignees.any(TaskAssignee.user_id == filters.assignee_id)
+        )
+    if filters.watcher_id is not None:
+        conditions.append(Task.watchers.any(TaskWatcher.user_id == filters.watcher_id))
+    if filters.created_from is not None:
+        conditions.append(Task.created_at >= filters.created_from)
+    if filters.created_to is not None:
+        conditions.append(Task.created_at < filters.created_to)
+    if filters.updated_from is not None:
+        conditions.append(Task.updated_at >= filters.updated_from)
+    if filters.updated_to is not None:
+        conditions.append(Task.updated_at < filters.updated_to)
+    if filters.title:
+        # Экранируем спецсимволы LIKE, поиск обслуживается индексом ix_task_title_trgm
+        pattern = (
+            filters.title.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        )
+        conditions.append(Task.title.ilike(f"%{pattern}%", escape="\\"))
+    return conditions
+
+
+def _access_condition(user_id: int) -> Any:
+    """Пользователь - создатель, исполнитель или наблюдатель задачи"""
+    return or_(
+        Task.creator_id == user_id,
+        Task.assignees.any(TaskAssignee.user_id == user_id),
+        Task.watchers.any(TaskWatcher.user_id == user_id),
+    )
+
+
+def _user_task_ids(user_id: int) -> Subquery:
+    """
+    Подзапрос ID задач пользователя (созданные, назначенные, наблюдаемые).
+
+    UNION вместо OR по трем источникам: каждая ветка читается своим индексом
+    (ix_task_creator_id_updated_at_id, ix_taskassignee_user_id_task_id,
+    ix_taskwatcher_user_id_task_id), а UNION убирает дубликаты задач.
+    """
+    return union(
+        select(Task.id.label("task_id")).where(Task.creator_id == user_id),
+        select(TaskAssignee.task_id).where(TaskAssignee.user_id == user_id),
+        select(TaskWatcher.task_id).where(TaskWatcher.user_id == user_id),
+    ).subquery()
 
 
 class CRUDTask(CRUDBase[Task, TaskCreate, TaskUpdate]):
     """CRUD операции для задач"""
 
+    # Сначала недавно обновленные задачи, индекс ix_task_updated_at_id
+    keyset_columns = ("updated_at", "id")
+    keyset_descending = True
+
+    # Колонки keyset-пагинации для каждого ключа сортировки TaskFilter.sort
+    sort_keysets = {
+        "updated_at": ("updated_at", "id"),
+        "created_at": ("created_at", "id"),
+        "title": ("title", "id"),
+        "id": ("id",),
+    }
+
     async def get(self, db: AsyncSession, id: Any) -> Optional[Task]:
         """Получение задачи по ID с загрузкой связанных объектов"""
+        query = select(Task).where(Task.id == id).options(*_task_relations())
+        result = await db.execute(query)
+        db_task = result.scalars().first()
+        if db_task is not None:
+            await status_registry.ensure_loaded(db, [db_task.status_id])
+        return db_task
+
+    async def get_version(
+        self, db: AsyncSession, *, id: int, user_id: int
+    ) -> Optional[Row]:
+        """
+        Версия задачи для условных запросов без загрузки связанных объектов.
+
+        Помимо updated_at задачи учитывает состав исполнителей и наблюдателей
+        и updated_at всех связанных пользователей, так как они входят в
+        TaskDetail. Строка содержит updated_at, status_id, creator_updated_at,
+        members_version и has_access (пользователь создатель, исполнитель или
+        наблюдатель задачи).
+        """
+        member = aliased(User)
+        members = union_all(
+            select(literal_column("'a'").label("role"), TaskAssignee.user_id).where(
+                TaskAssignee.task_id == id
+            ),
+            select(literal_column("'w'"), TaskWatcher.user_id).where(
+                TaskWatcher.task_id == id
+            ),
+        ).subquery()
+        members_version = (
+            select(
+                func.md5(
+                    func.string_agg(
+                        func.concat(
+                            members.c.role,
+                            members.c.user_id,
+                            literal_column("':'"),
+                            member.updated_at,
+                        ),
+                        aggregate_order_by(
+                            literal_column("','"), members.c.role, members.c.user_id
+                        ),
+                    )
+                )
+            )
+            .join_from(members, member, member.id == members.c.user_id)
+            .scalar_subquery()
+        )
+        has_access = _access_condition(user_id)
         query = (
-            select(Task)
-            .where(Task.id == id)
-            .options(
-                selectinload(Task.creator),
-                selectinload(Task.status),
-                selectinload(Task.assignees).options(selectinload(TaskAssignee.user)),
-                selectinload(Task.watchers).options(selectinload(TaskWatcher.user)),
+            select(
+                Task.updated_at,
+                Task.status_id,
+                User.updated_at.label("creator_updated_at"),
+                members_version.label("members_version"),
+                has_access.label("has_access"),
             )
+            .outerjoin(User, User.id == Task.creator_id)
+            .where(Task.id == id)
         )
         result = await db.execute(query)
-        return result.scalars().first()
+        return result.first()
+
+    async def has_access(
+        self, db: AsyncSession, *, id: int, user_id: int
+    ) -> Optional[bool]:
+        """
+        Является ли пользователь создателем, исполнителем или наблюдателем
+        задачи, одним запросом без загрузки задачи
+
+        Returns:
+            None, если задачи нет
+        """
+        query = select(_access_condition(user_id)).where(Task.id == id)
+        result = await db.execute(query)
+        return result.scalar_one_or_none()
 
     async def get_multi(
-        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
+        self,
+        db: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[str] = None,
+        filters: Optional[TaskFilter] = None,
     ) -> List[Task]:
         """Получение списка задач с загрузкой связанных объектов"""
-        query = (
-            select(Task)
-            .options(
-                selectinload(Task.creator),
-                selectinload(Task.status),
-                selectinload(Task.assignees).options(selectinload(TaskAssignee.user)),
-                selectinload(Task.watchers).options(selectinload(TaskWatcher.user)),
-            )
-            .offset(skip)
-            .limit(limit)
+        return await self._get_page(
+            db, select(Task), filters=filters, skip=skip, limit=limit, after=after
         )
-        result = await db.execute(query)
-        return result.scalars().all()
 
     async def get_by_creator(
-        self, db: AsyncSession, *, creator_id: int, skip: int = 0, limit: int = 100
+        self,
+        db: AsyncSession,
+        *,
+        creator_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[str] = None,
+        filters: Optional[TaskFilter] = None,
     ) -> List[Task]:
         """Получение задач по ID создателя"""
-        query = (
-            select(Task)
-            .where(Task.creator_id == creator_id)
-            .options(
-                selectinload(Task.creator),
-                selectinload(Task.status),
-                selectinload(Task.assignees).options(selectinload(TaskAssignee.user)),
-                selectinload(Task.watchers).options(selectinload(TaskWatcher.user)),
-            )
-            .offset(skip)
-            .limit(limit)
+        query = select(Task).where(Task.creator_id == creator_id)
+        return await self._get_page(
+            db, query, filters=filters, skip=skip, limit=limit, after=after
         )
-        result = await db.execute(query)
-        return result.scalars().all()
 
     async def get_assigned_to_user(
-        self, db: AsyncSession, *, user_id: int, skip: int = 0, limit: int = 100
+        self,
+        db: AsyncSession,
+        *,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[str] = None,
+        filters: Optional[TaskFilter] = None,
     ) -> List[Task]:
         """Получение задач, назначенных пользователю"""
         query = (
             select(Task)
             .join(TaskAssignee, Task.id == TaskAssignee.task_id)
             .where(TaskAssignee.user_id == user_id)
-            .options(
-                selectinload(Task.creator),
-                selectinload(Task.status),
-                selectinload(Task.assignees).options(selectinload(TaskAssignee.user)),
-                selectinload(Task.watchers).options(selectinload(TaskWatcher.user)),
-            )
-            .offset(skip)
-            .limit(limit)
         )
-        result = await db.execute(query)
-        return result.scalars().all()
+        return await self._get_page(
+            db, query, filters=filters, skip=skip, limit=limit, after=after
+        )
 
     async def get_watched_by_user(
-        self, db: AsyncSession, *, user_id: int, skip: int = 0, limit: int = 100
+        self,
+        db: AsyncSession,
+        *,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[str] = None,
+        filters: Optional[TaskFilter] = None,
     ) -> List[Task]:
         """Получение задач, за которыми наблюдает пользователь"""
         query = (
             select(Task)
             .join(TaskWatcher, Task.id == TaskWatcher.task_id)
             .where(TaskWatcher.user_id == user_id)
-            .options(
-                selectinload(Task.creator),
-                selectinload(Task.status),
-                selectinload(Task.assignees).options(selectinload(TaskAssignee.user)),
-                selectinload(Task.watchers).options(selectinload(TaskWatcher.user)),
-            )
-            .offset(skip)
-            .limit(limit)
         )
-        result = await db.execute(query)
-        return result.scalars().all()
+        return await self._get_page(
+            db, query, filters=filters, skip=skip, limit=limit, after=after
+        )
 
     async def get_user_tasks(
-        self, db: AsyncSession, *, user_id: int, skip: int = 0, limit: int = 100
+        self,
+        db: AsyncSession,
+        *,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[str] = None,
+        filters: Optional[TaskFilter] = None,
     ) -> List[Task]:
         """
         Получение всех задач, связанных с пользователем
         (созданные им, назначенные ему или за которыми он наблюдает)
         """
-        query = (
-            select(Task)
-            .where(
-                or_(
-                    Task.creator_id == user_id,
-                    Task.id.in_(
-                        select(TaskAssignee.task_id).where(
-                            TaskAssignee.user_id == user_id
-                        )
-                    ),
-                    Task.id.in_(
-                        select(TaskWatcher.task_id).where(
-                            TaskWatcher.user_id == user_id
-                        )
-                    ),
+        task_ids = _user_task_ids(user_id)
+        query = select(Task).join(task_ids, Task.id == task_ids.c.task_id)
+        return await self._get_page(
+            db, query, filters=filters, skip=skip, limit=limit, after=after
+        )
+
+    async def get_user_dashboard(
+        self, db: AsyncSession, *, user_id: int, limit: int = 100
+    ) -> Tuple[Dict[str, List[int]], List[Task]]:
+        """
+        Получение задач пользователя, сгруппированных по ролям
+        (created, assigned, watching).
+
+        Первый запрос возвращает до limit ID задач на каждую роль, второй
+        загружает каждую задачу один раз вместе со связанными объектами.
+        """
+        memberships = union_all(
+            select(
+                Task.id.label("task_id"), literal_column("'created'").label("role")
+            ).where(Task.creator_id == user_id),
+            select(TaskAssignee.task_id, literal_column("'assigned'")).where(
+                TaskAssignee.user_id == user_id
+            ),
+            select(TaskWatcher.task_id, literal_column("'watching'")).where(
+                TaskWatcher.user_id == user_id
+            ),
+        ).subquery()
+        ranked = (
+            select(
+                memberships.c.task_id,
+                memberships.c.role,
+                func.row_number()
+                .over(
+                    partition_by=memberships.c.role,
+                    order_by=(Task.updated_at.desc(), Task.id.desc()),
                 )
+                .label("position"),
             )
-            .options(
-                selectinload(Task.creator),
-                selectinload(Task.status),
-                selectinload(Task.assignees).options(selectinload(TaskAssignee.user)),
-                selectinload(Task.watchers).options(selectinload(TaskWatcher.user)),
-            )
-            .offset(skip)
-            .limit(limit)
+            .join(Task, Task.id == memberships.c.task_id)
+            .subquery()
+        )
+        query = (
+            select(ranked.c.task_id, ranked.c.role)
+            .where(ranked.c.position <= limit)
+            .order_by(ranked.c.role, ranked.c.position)
+        )
+        result = await db.execute(query)
+
+        buckets: Dict[str, List[int]] = {"created": [], "assigned": [], "watching": []}
+        for task_id, role in result.all():
+            buckets[role].append(task_id)
+
+        task_ids = {task_id for ids in buckets.values() for task_id in ids}
+        if not task_ids:
+            return buckets, []
+
+        query = select(Task).where(Task.id.in_(task_ids)).options(*_task_relations())
+        result = await db.execute(query)
+        db_tasks = result.scalars().all()
+        await status_registry.ensure_loaded(db, (t.status_id for t in db_tasks))
+        return buckets, db_tasks
+
+    async def get_stats(
+        self, db: AsyncSession, *, user_id: Optional[int] = None
+    ) -> List[Row]:
+        """
+        Подсчет задач по статусам и ролям одним GROUP BY запросом без загрузки
+        объектов. Без user_id считаются все задачи.
+        """
+        if user_id is None:
+            is_created = true()
+            is_assigned = Task.assignees.any()
+            is_watching = Task.watchers.any()
+            query = select(Task.status_id)
+        else:
+            is_created = Task.creator_id == user_id
+            is_assigned = Task.assignees.any(TaskAssignee.user_id == user_id)
+            is_watching = Task.watchers.any(TaskWatcher.user_id == user_id)
+            task_ids = _user_task_ids(user_id)
+            query = select(Task.status_id).join(task_ids, Task.id == task_ids.c.task_id)
+
+        query = query.add_columns(
+            func.count().label("total"),
+            func.count().filter(is_created).label("created"),
+            func.count().filter(is_assigned).label("assigned"),
+            func.count().filter(is_watching).label("watching"),
+        ).group_by(Task.status_id)
+        result = await db.execute(query)
+        return result.all()
+
+    def keyset_for(self, filters: Optional[TaskFilter]) -> Keyset:
+        """Порядок keyset-пагинации для выбранного ключа сортировки"""
+        if filters is None:
+            return self.keyset
+        field = filters.sort.lstrip("-")
+        return self.sort_keysets[field], filters.sort.startswith("-")
+
+    async def _get_page(
+        self,
+        db: AsyncSession,
+        query: Select,
+        *,
+        filters: Optional[TaskFilter],
+        skip: int,
+        limit: int,
+        after: Optional[str],
+    ) -> List[Task]:
+        """
+        Выполнение запроса списка задач одним SQL запросом с фильтрами,
+        сортировкой и пагинацией
+        """
+        if filters is not None:
+            query = query.where(*_task_conditions(filters))
+        query = self.paginate(
+            query.options(*_task_relations()),
+            skip=skip,
+            limit=limit,
+            after=after,
+            keyset=self.keyset_for(filters),
         )
         result = await db.execute(query)
-        return result.scalars().all()
+        db_tasks = result.scalars().all()
+        await status_registry.ensure_loaded(db, (t.status_id for t in db_tasks))
+        return db_tasks
 
     async def create(self, db: AsyncSession, *, obj_in: TaskCreate) -> Task:
         """Создание новой задачи с назначением исполнителей и наблюдателей"""
@@ -211,6 +462,7 @@ class CRUDTask(CRUDBase[Task, TaskCreate, TaskUpdate]):
 
         await db.commit()
         await db.refresh(db_obj)
+        await status_registry.ensure_loaded(db, [db_obj.status_id])
         return db_obj
 
 
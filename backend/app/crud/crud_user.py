@@ -1,12 +1,14 @@
 from typing import Any, Dict, Optional, Union
 
-from sqlalchemy import select
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash, verify_and_update_password
 from app.crud import CRUDBase
 from app.models import User
 from app.schemas import UserCreate, UserUpdate
+from app.services import user_cache
 
 
 class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
@@ -32,12 +34,40 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
         result = await db.execute(query)
         return result.scalars().first()
 
+    async def get_page_version(
+        self,
+        db: AsyncSession,
+        *,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Версия страницы пользователей для условных запросов.
+
+        Хэш ID и updated_at пользователей страницы считается в базе данных
+        без загрузки самих пользователей. Пустая страница дает None.
+        """
+        page = self.paginate(
+            select(User.id, User.updated_at), skip=skip, limit=limit, after=after
+        ).subquery()
+        query = select(
+            func.md5(
+                func.string_agg(
+                    func.concat(page.c.id, literal_column("':'"), page.c.updated_at),
+                    aggregate_order_by(literal_column("','"), page.c.id),
+                )
+            )
+        )
+        result = await db.execute(query)
+        return result.scalar()
+
     async def create(self, db: AsyncSession, *, obj_in: UserCreate) -> User:
         """Создание нового пользователя с хэшированием пароля"""
         db_obj = User(
             email=obj_in.email,
             username=obj_in.username,
-            hashed_password=get_password_hash(obj_in.password),
+            hashed_password=await get_password_hash(obj_in.password),
             first_name=obj_in.first_name,
             last_name=obj_in.last_name,
             is_active=obj_in.is_active,
@@ -61,21 +91,40 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
             update_data = obj_in.model_dump(exclude_unset=True)
 
         if "password" in update_data and update_data["password"]:
-            hashed_password = get_password_hash(update_data["password"])
+            hashed_password = await get_password_hash(update_data["password"])
             del update_data["password"]
             update_data["hashed_password"] = hashed_password
 
-        return await super().update(db, db_obj=db_obj, obj_in=update_data)
+        db_obj = await super().update(db, db_obj=db_obj, obj_in=update_data)
+        await user_cache.invalidate(db_obj.id)
+        return db_obj
+
+    async def remove(self, db: AsyncSession, *, id: int) -> Optional[User]:
+        """Удаление пользователя с удалением из кэша аутентификации"""
+        db_obj = await super().remove(db, id=id)
+        await user_cache.invalidate(id)
+        return db_obj
 
     async def authenticate(
         self, db: AsyncSession, *, email: str, password: str
     ) -> Optional[User]:
-        """Аутентификация пользователя по email и паролю"""
+        """
+        Аутентификация пользователя по email и паролю.
+        Хэш с устаревшими схемой или стоимостью заменяется новым после входа.
+        """
         user = await self.get_by_email(db, email=email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        verified, new_hash = await verify_and_update_password(
+            password, user.hashed_password
+        )
+        if not verified:
             return None
+        if new_hash:
+            user = await super().update(
+                db, db_obj=user, obj_in={"hashed_password": new_hash}
+            )
+            await user_cache.invalidate(user.id)
         return user
 
     async def is_active(self, user: User) -> bool:
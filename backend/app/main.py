@@ -1,13 +1,41 @@
+import logging
+from contextlib import asynccontextmanager
+
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-from app.api.endpoints import auth, statuses, tasks, users
-from app.api.websockets import router as websocket_router
+from app.api.endpoints import auth, metrics, statuses, tasks, users
+from app.api.websockets import manager as websocket_manager, router as websocket_router
 from app.core.config import settings
+from app.core.security import password_hasher
+from app.crud import InvalidCursorError
+from app.db.session import AsyncSessionLocal
+from app.services import status_registry
+from app.utils.etag import ETAG_HEADER
+from app.utils.pagination import NEXT_CURSOR_HEADER
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Загружаем кэш статусов задач заранее, чтобы первые запросы не ждали его
+    try:
+        async with AsyncSessionLocal() as db:
+            await status_registry.load(db)
+    except Exception:
+        logger.exception("Failed to preload task statuses, will load on demand")
+    await websocket_manager.start()
+    yield
+    await websocket_manager.stop()
+    password_hasher.shutdown()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
+    lifespan=lifespan,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url=f"{settings.API_V1_STR}/docs",
     redoc_url=f"{settings.API_V1_STR}/redoc",
@@ -17,6 +45,7 @@ app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
 app.include_router(tasks.router, prefix="/api/v1/tasks", tags=["tasks"])
 app.include_router(statuses.router, prefix="/api/v1/statuses", tags=["statuses"])
+app.include_router(metrics.router, prefix="/api/v1/metrics", tags=["metrics"])
 app.include_router(websocket_router, prefix="/api/v1", tags=["websockets"])
 
 # Настройка CORS
@@ -27,6 +56,14 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, ETAG_HEADER],
+    )
+
+
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursorError):
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exc)}
     )
 
 
@@ -1,6 +1,15 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, Boolean
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+)
 from sqlalchemy.orm import relationship
 
 from app.db.base_class import Base
@@ -19,7 +28,14 @@ class Comment(Base):
     # Отношения
     task = relationship("Task", back_populates="comments")
     author = relationship("User", back_populates="comments")
-    mentions = relationship("CommentMention", back_populates="comment", cascade="all, delete")
+    mentions = relationship(
+        "CommentMention", back_populates="comment", cascade="all, delete"
+    )
+
+    __table_args__ = (
+        # Страницы истории комментариев задачи по ID (since_id/before_id)
+        Index("ix_comment_task_id_id", "task_id", "id"),
+    )
 
 
 class CommentMention(Base):
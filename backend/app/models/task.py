@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 
 from app.db.base_class import Base
@@ -20,10 +20,29 @@ class Task(Base):
         "User", back_populates="tasks_created", foreign_keys=[creator_id]
     )
     status = relationship("TaskStatus", back_populates="tasks")
-    assignees = relationship("TaskAssignee", back_populates="task", cascade="all, delete")
+    assignees = relationship(
+        "TaskAssignee", back_populates="task", cascade="all, delete"
+    )
     watchers = relationship("TaskWatcher", back_populates="task", cascade="all, delete")
     comments = relationship("Comment", back_populates="task", cascade="all, delete")
 
+    __table_args__ = (
+        # Стабильная сортировка и курсорная пагинация списков задач
+        Index("ix_task_updated_at_id", "updated_at", "id"),
+        Index("ix_task_created_at_id", "created_at", "id"),
+        Index("ix_task_title_id", "title", "id"),
+        # Фильтрация по статусу и создателю с сортировкой по дате обновления
+        Index("ix_task_status_id_updated_at_id", "status_id", "updated_at", "id"),
+        Index("ix_task_creator_id_updated_at_id", "creator_id", "updated_at", "id"),
+        # Поиск по подстроке названия (ILIKE '%...%'), требует расширения pg_trgm
+        Index(
+            "ix_task_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+    )
+
 
 class TaskAssignee(Base):
     task_id = Column(Integer, ForeignKey("task.id"), primary_key=True)
@@ -33,6 +52,11 @@ class TaskAssignee(Base):
     task = relationship("Task", back_populates="assignees")
     user = relationship("User", back_populates="tasks_assigned")
 
+    __table_args__ = (
+        # Поиск задач пользователя, первичный ключ начинается с task_id
+        Index("ix_taskassignee_user_id_task_id", "user_id", "task_id"),
+    )
+
 
 class TaskWatcher(Base):
     task_id = Column(Integer, ForeignKey("task.id"), primary_key=True)
@@ -41,3 +65,8 @@ class TaskWatcher(Base):
     # Отношения
     task = relationship("Task", back_populates="watchers")
     user = relationship("User", back_populates="tasks_watching")
+
+    __table_args__ = (
+        # Поиск задач пользователя, первичный ключ начинается с task_id
+        Index("ix_taskwatcher_user_id_task_id", "user_id", "task_id"),
+    )
@@ -1,4 +1,18 @@
 from .comment import Comment, CommentCreate, CommentMention, CommentUpdate
 from .status import TaskStatus, TaskStatusCreate, TaskStatusUpdate
-from .task import Task, TaskAssignee, TaskCreate, TaskDetail, TaskUpdate, TaskWatcher
+from .task import (
+    Task,
+    TaskAssignee,
+    TaskCreate,
+    TaskDashboard,
+    TaskDetail,
+    TaskFilter,
+    TaskListFormat,
+    TaskListNormalized,
+    TaskNormalized,
+    TaskStats,
+    TaskStatusCounters,
+    TaskUpdate,
+    TaskWatcher,
+)
 from .user import Token, TokenPayload, User, UserCreate, UserInDB, UserUpdate
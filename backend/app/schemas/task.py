@@ -1,4 +1,5 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, List, Literal, Optional
 
 from app.schemas.base import BaseSchema, TimestampMixin
 from app.schemas.status import TaskStatus
@@ -59,3 +60,94 @@ class TaskWatcher(BaseSchema):
 
     task_id: int
     user_id: int
+
+
+# Ключи сортировки списков задач, префикс "-" означает порядок по убыванию
+TaskSortKey = Literal[
+    "updated_at",
+    "-updated_at",
+    "created_at",
+    "-created_at",
+    "title",
+    "-title",
+    "id",
+    "-id",
+]
+
+
+class TaskFilter(BaseSchema):
+    """Параметры фильтрации и сортировки списков задач"""
+
+    status_id: Optional[int] = None
+    creator_id: Optional[int] = None
+    assignee_id: Optional[int] = None
+    watcher_id: Optional[int] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    updated_from: Optional[datetime] = None
+    updated_to: Optional[datetime] = None
+    title: Optional[str] = None  # Подстрока названия без учета регистра
+    sort: TaskSortKey = "-updated_at"
+
+
+class TaskStatusCounters(BaseSchema):
+    """Количество задач в одном статусе в разрезе ролей пользователя"""
+
+    status_id: Optional[int] = None
+    total: int = 0
+    created: int = 0
+    assigned: int = 0
+    watching: int = 0
+
+
+class TaskStats(BaseSchema):
+    """
+    Счетчики задач пользователя по статусам и ролям.
+
+    Для сводной статистики суперпользователя created совпадает с total,
+    а assigned и watching считают задачи с хотя бы одним исполнителем
+    или наблюдателем.
+    """
+
+    total: int = 0
+    created: int = 0
+    assigned: int = 0
+    watching: int = 0
+    by_status: List[TaskStatusCounters] = []
+
+
+class TaskDashboard(BaseSchema):
+    """
+    Задачи пользователя, сгруппированные по ролям.
+
+    Списки содержат ID задач в порядке сортировки, а сами задачи передаются
+    один раз в словаре tasks, даже если задача входит в несколько списков.
+    """
+
+    created: List[int] = []
+    assigned: List[int] = []
+    watching: List[int] = []
+    tasks: Dict[int, TaskDetail] = {}
+
+
+# Формат ответа списков задач
+TaskListFormat = Literal["detail", "normalized"]
+
+
+class TaskNormalized(TaskBase, TimestampMixin):
+    """Задача со ссылками на связанные объекты по ID"""
+
+    id: int
+    assignee_ids: List[int] = []
+    watcher_ids: List[int] = []
+
+
+class TaskListNormalized(BaseSchema):
+    """
+    Нормализованный список задач: пользователи и статусы передаются один раз
+    в словарях users и statuses, а задачи ссылаются на них по ID
+    """
+
+    tasks: List[TaskNormalized] = []
+    users: Dict[int, User] = {}
+    statuses: Dict[int, TaskStatus] = {}
@@ -0,0 +1,3 @@
+from .admission import CredentialAdmission, RateLimiter, credential_admission
+from .status_registry import StatusRegistry, status_registry
+from .user_cache import UserCache, user_cache
@@ -0,0 +1,187 @@
+import ipaddress
+import math
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple, Union
+
+from fastapi import HTTPException, Request, status
+
+from app.core.config import settings
+
+
+class RateLimiter:
+    """
+    Ограничение частоты запросов по ключу (token bucket).
+
+    Каждому ключу доступно rate запросов за period секунд, токены
+    восстанавливаются равномерно. Число хранимых ключей ограничено,
+    давно не использованные ключи вытесняются.
+    """
+
+    def __init__(self, rate: int, period: float, max_keys: int = 10000):
+        """
+        Args:
+            rate: Количество запросов за период
+            period: Длительность периода в секундах
+            max_keys: Максимальное количество отслеживаемых ключей
+        """
+        self.rate = rate
+        self.period = period
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def acquire(self, key: str) -> float:
+        """
+        Попытка израсходовать токен ключа
+
+        Returns:
+            0, если запрос разрешен, иначе через сколько секунд появится токен
+        """
+        now = time.monotonic()
+        refill = self.rate / self.period
+        tokens, updated_at = self._buckets.get(key, (float(self.rate), now))
+        tokens = min(float(self.rate), tokens + (now - updated_at) * refill)
+        if tokens < 1:
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / refill
+        self._buckets[key] = (tokens - 1, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return 0.0
+
+
+class CredentialAdmission:
+    """
+    Контроль допуска запросов, проверяющих или создающих пароли.
+
+    Хэширование паролей - самая дорогая по CPU операция, поэтому число
+    одновременных таких запросов на воркер ограничено, а частота запросов
+    ограничена по IP клиента и по email. При исчерпании лимита запрос сразу
+    отклоняется с Retry-After, а не встает в неограниченную очередь.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        ip_rate: int,
+        email_rate: int,
+        period: float,
+    ):
+        """
+        Args:
+            max_concurrent: Максимальное число одновременных запросов
+            ip_rate: Запросов с одного IP за период
+            email_rate: Запросов для одного email за период
+            period: Длительность периода в секундах
+        """
+        self.max_concurrent = max_concurrent
+        self.ip_limiter = RateLimiter(ip_rate, period)
+        self.email_limiter = RateLimiter(email_rate, period)
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected_overloaded = 0
+        self.rejected_ip = 0
+        self.rejected_email = 0
+
+    @asynccontextmanager
+    async def admit(
+        self, request: Request, email: Optional[str] = None
+    ) -> AsyncIterator[None]:
+        """
+        Допуск запроса на время выполнения блока
+
+        Args:
+            request: Входящий запрос, из него берется IP клиента
+            email: Email, для которого проверяется или создается пароль
+
+        Raises:
+            HTTPException: 503, если воркер занят, 429 при превышении частоты
+        """
+        if self.in_flight >= self.max_concurrent:
+            self.rejected_overloaded += 1
+            raise _rejected(status.HTTP_503_SERVICE_UNAVAILABLE, 1.0)
+
+        retry_after = self.ip_limiter.acquire(client_ip(request))
+        if retry_after:
+            self.rejected_ip += 1
+            raise _rejected(status.HTTP_429_TOO_MANY_REQUESTS, retry_after)
+
+        if email:
+            retry_after = self.email_limiter.acquire(email.lower())
+            if retry_after:
+                self.rejected_email += 1
+                raise _rejected(status.HTTP_429_TOO_MANY_REQUESTS, retry_after)
+
+        self.in_flight += 1
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+
+    def stats(self) -> Dict[str, int]:
+        """Счетчики допущенных и отклоненных запросов для метрик"""
+        return {
+            "in_flight": self.in_flight,
+            "admitted": self.admitted,
+            "rejected_overloaded": self.rejected_overloaded,
+            "rejected_ip": self.rejected_ip,
+            "rejected_email": self.rejected_email,
+        }
+
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+def _networks(addresses: List[str]) -> List[Network]:
+    """Сети доверенных прокси из настроек, отдельный IP - сеть из одного адреса"""
+    return [ipaddress.ip_network(address, strict=False) for address in addresses]
+
+
+_trusted_proxies = _networks(settings.TRUSTED_PROXIES)
+
+
+def _is_trusted_proxy(host: str) -> bool:
+    """Запрос пришел с адреса доверенного прокси"""
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in _trusted_proxies)
+
+
+def client_ip(request: Request) -> str:
+    """
+    IP клиента. Заголовок CLIENT_IP_HEADER учитывается, только если запрос
+    пришел напрямую от доверенного прокси, иначе берется адрес соединения
+    """
+    host = request.client.host if request.client else "unknown"
+    if settings.CLIENT_IP_HEADER and _is_trusted_proxy(host):
+        forwarded = request.headers.get(settings.CLIENT_IP_HEADER)
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return host
+
+
+def _rejected(status_code: int, retry_after: float) -> HTTPException:
+    """Ответ об отказе в допуске с заголовком Retry-After"""
+    detail = (
+        "Too many requests"
+        if status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        else "Server is busy, try again later"
+    )
+    return HTTPException(
+        status_code=status_code,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+credential_admission = CredentialAdmission(
+    max_concurrent=settings.CREDENTIAL_MAX_CONCURRENT,
+    ip_rate=settings.CREDENTIAL_RATE_PER_IP,
+    email_rate=settings.CREDENTIAL_RATE_PER_EMAIL,
+    period=settings.CREDENTIAL_RATE_PERIOD_SECONDS,
+)
@@ -0,0 +1,104 @@
+import asyncio
+import hashlib
+import time
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models import TaskStatus
+from app.schemas import TaskStatus as TaskStatusSchema
+
+
+class StatusRegistry:
+    """
+    Кэш статусов задач в памяти процесса.
+
+    Статусы меняются редко, поэтому загружаются целиком одним запросом и
+    хранятся в виде схем, не привязанных к сессии. Изменения через
+    CRUDTaskStatus сразу применяются к кэшу, а изменения, сделанные другими
+    процессами, подхватываются после истечения ttl.
+    """
+
+    def __init__(self, ttl: float):
+        """
+        Args:
+            ttl: Время жизни загруженных данных в секундах
+        """
+        self.ttl = ttl
+        # Увеличивается при каждом изменении набора статусов
+        self.version = 0
+        # Хэш содержимого кэша, одинаковый во всех процессах с одними данными
+        self.digest = ""
+        self._statuses: Dict[int, TaskStatusSchema] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_fresh(self) -> bool:
+        """Загружены ли статусы и не истек ли ttl"""
+        return (
+            self._loaded_at is not None
+            and time.monotonic() - self._loaded_at < self.ttl
+        )
+
+    async def load(self, db: AsyncSession) -> None:
+        """Загрузка всех статусов из базы данных"""
+        result = await db.execute(select(TaskStatus).order_by(TaskStatus.id))
+        statuses = {
+            db_status.id: TaskStatusSchema.model_validate(db_status)
+            for db_status in result.scalars()
+        }
+        if statuses != self._statuses:
+            self._statuses = statuses
+            self._changed()
+        self._loaded_at = time.monotonic()
+
+    async def ensure_loaded(
+        self, db: AsyncSession, ids: Iterable[Optional[int]] = ()
+    ) -> None:
+        """
+        Перезагрузка статусов, если кэш устарел или в нем нет нужных ID
+
+        Args:
+            db: Асинхронная сессия SQLAlchemy
+            ids: ID статусов, которые должны оказаться в кэше
+        """
+        required = {status_id for status_id in ids if status_id is not None}
+        if self.is_fresh and required.issubset(self._statuses):
+            return
+        async with self._lock:
+            if self.is_fresh and required.issubset(self._statuses):
+                return
+            await self.load(db)
+
+    def get(self, id: Optional[int]) -> Optional[TaskStatusSchema]:
+        """Статус по ID из кэша"""
+        if id is None:
+            return None
+        return self._statuses.get(id)
+
+    def all(self) -> List[TaskStatusSchema]:
+        """Все статусы в порядке ID"""
+        return list(self._statuses.values())
+
+    def put(self, db_status: TaskStatus) -> None:
+        """Добавление или обновление статуса после записи в базу данных"""
+        self._statuses[db_status.id] = TaskStatusSchema.model_validate(db_status)
+        self._statuses = dict(sorted(self._statuses.items()))
+        self._changed()
+
+    def discard(self, id: int) -> None:
+        """Удаление статуса из кэша после удаления из базы данных"""
+        self._statuses.pop(id, None)
+        self._changed()
+
+    def _changed(self) -> None:
+        """Обновление версии и хэша после изменения кэша"""
+        self.version += 1
+        content = "\n".join(item.model_dump_json() for item in self._statuses.values())
+        self.digest = hashlib.sha1(content.encode()).hexdigest()
+
+
+status_registry = StatusRegistry(ttl=settings.STATUS_CACHE_TTL_SECONDS)
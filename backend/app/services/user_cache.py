@@ -0,0 +1,80 @@
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.config import settings
+from app.models import User
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Колонки пользователя, значения которых хранятся в кэше
+_column_attrs = inspect(User).column_attrs
+
+# Рассылка сброса записи пользователя другим процессам: (user_id)
+Publish = Callable[[int], Awaitable[None]]
+
+
+class UserCache:
+    """
+    Кэш пользователей, найденных при аутентификации запросов.
+
+    Хранятся значения колонок, а не ORM объекты: объект привязан к сессии
+    запроса и не может одновременно использоваться в нескольких сессиях.
+    При попадании из значений собирается объект, который присоединяется к
+    сессии текущего запроса без обращения к базе данных. Изменения через
+    CRUDUser удаляют запись в текущем процессе и через publish во всех
+    остальных. Без publish (брокер WEBSOCKET_BROKER=memory) другие процессы
+    подхватывают изменения только после истечения ttl.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        Args:
+            maxsize: Максимальное количество пользователей в кэше
+            ttl: Время жизни записи в секундах
+        """
+        self._cache: TTLCache[int, Dict[str, Any]] = TTLCache(maxsize, ttl)
+        # Задается ConnectionManager при старте, рассылает сброс через брокер
+        self.publish: Optional[Publish] = None
+
+    async def get(self, db: AsyncSession, id: int) -> Optional[User]:
+        """Пользователь из кэша, присоединенный к сессии db"""
+        values = self._cache.get(id)
+        if values is None:
+            return None
+        db_user = User(**values)
+        make_transient_to_detached(db_user)
+        return await db.merge(db_user, load=False)
+
+    def put(self, db_user: User) -> None:
+        """Сохранение значений колонок пользователя"""
+        values = {attr.key: getattr(db_user, attr.key) for attr in _column_attrs}
+        self._cache.set(db_user.id, values)
+
+    def discard(self, id: int) -> None:
+        """Удаление пользователя из кэша текущего процесса"""
+        self._cache.discard(id)
+
+    async def invalidate(self, id: int) -> None:
+        """Удаление пользователя из кэша всех процессов после изменения в базе"""
+        self.discard(id)
+        if self.publish is None:
+            return
+        try:
+            await self.publish(id)
+        except Exception:
+            # Изменение уже сохранено, остальные процессы сбросят запись по ttl
+            logger.exception("Failed to publish user cache invalidation")
+
+    def stats(self) -> Dict[str, Any]:
+        """Размер кэша и счетчики попаданий и промахов"""
+        return self._cache.stats()
+
+
+user_cache = UserCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+)
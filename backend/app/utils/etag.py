@@ -0,0 +1,50 @@
+import hashlib
+from typing import Any
+
+from fastapi import Request, Response, status
+
+# Заголовки условного GET
+ETAG_HEADER = "ETag"
+IF_NONE_MATCH_HEADER = "If-None-Match"
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Формирует сильный ETag из частей версии ресурса
+
+    Args:
+        parts: Значения, изменение любого из которых меняет ETag
+
+    Returns:
+        ETag в кавычках
+    """
+    raw = "|".join("" if part is None else str(part) for part in parts)
+    return f'"{hashlib.sha1(raw.encode()).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Проверяет, совпадает ли ETag с одним из значений If-None-Match
+
+    Args:
+        request: Входящий запрос
+        etag: Текущий ETag ресурса
+
+    Returns:
+        True, если у клиента актуальная версия ресурса
+    """
+    header = request.headers.get(IF_NONE_MATCH_HEADER)
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Для If-None-Match используется слабое сравнение, префикс W/ игнорируется
+    candidates = (value.strip().removeprefix("W/") for value in header.split(","))
+    return etag in candidates
+
+
+def not_modified(etag: str) -> Response:
+    """Ответ 304 Not Modified без тела"""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED, headers={ETAG_HEADER: etag}
+    )
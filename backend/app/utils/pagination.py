@@ -0,0 +1,30 @@
+from typing import Any, Optional, Sequence
+
+from fastapi import Response
+
+from app.crud import CRUDBase, Keyset
+
+# Заголовок ответа с курсором следующей страницы
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def set_next_cursor(
+    response: Response,
+    crud: CRUDBase,
+    items: Sequence[Any],
+    limit: int,
+    keyset: Optional[Keyset] = None,
+) -> None:
+    """
+    Добавляет в ответ курсор следующей страницы, если она может существовать
+
+    Args:
+        response: Ответ эндпоинта
+        crud: CRUD объект, сформировавший страницу
+        items: Объекты текущей страницы
+        limit: Запрошенный размер страницы
+        keyset: Порядок сортировки страницы, по умолчанию порядок CRUD объекта
+    """
+    cursor = crud.next_cursor(items, limit, keyset=keyset)
+    if cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
@@ -0,0 +1,37 @@
+from typing import Any, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+# Тип содержимого, который выставляет стандартный JSONResponse FastAPI
+JSON_MEDIA_TYPE = "application/json"
+
+
+def json_response(
+    adapter: TypeAdapter, data: Any, response: Optional[Response] = None
+) -> Response:
+    """
+    Сериализует данные в JSON за один проход pydantic-core.
+
+    Данные (словари, ORM объекты) валидируются заранее созданным TypeAdapter
+    и сразу кодируются в байты, минуя построение моделей в Python, повторную
+    валидацию по response_model и json.dumps. Результат побайтно совпадает
+    с ответом, который FastAPI сформировал бы для той же схемы.
+
+    Args:
+        adapter: TypeAdapter схемы ответа
+        data: Данные для сериализации
+        response: Ответ эндпоинта, заголовки и код которого нужно сохранить
+
+    Returns:
+        Готовый HTTP ответ
+    """
+    content = adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+    if response is None:
+        return Response(content=content, media_type=JSON_MEDIA_TYPE)
+    return Response(
+        content=content,
+        status_code=response.status_code or 200,
+        headers=dict(response.headers),
+        media_type=JSON_MEDIA_TYPE,
+    )
@@ -0,0 +1,25 @@
+"""Add task keyset pagination index
+
+Revision ID: 3f9a1c2d7b41
+Revises: 54165152f3ac
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f9a1c2d7b41"
+down_revision: Union[str, None] = "54165152f3ac"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_task_updated_at_id", "task", ["updated_at", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_task_updated_at_id", table_name="task")
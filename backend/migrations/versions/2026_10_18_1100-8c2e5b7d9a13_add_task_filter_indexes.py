@@ -0,0 +1,56 @@
+"""Add task filter indexes
+
+Revision ID: 8c2e5b7d9a13
+Revises: 3f9a1c2d7b41
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8c2e5b7d9a13"
+down_revision: Union[str, None] = "3f9a1c2d7b41"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index("ix_task_created_at_id", "task", ["created_at", "id"], unique=False)
+    op.create_index("ix_task_title_id", "task", ["title", "id"], unique=False)
+    op.create_index(
+        "ix_task_status_id_updated_at_id",
+        "task",
+        ["status_id", "updated_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_task_creator_id_updated_at_id",
+        "task",
+        ["creator_id", "updated_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_task_title_trgm",
+        "task",
+        ["title"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"title": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_task_title_trgm",
+        table_name="task",
+        postgresql_using="gin",
+        postgresql_ops={"title": "gin_trgm_ops"},
+    )
+    op.drop_index("ix_task_creator_id_updated_at_id", table_name="task")
+    op.drop_index("ix_task_status_id_updated_at_id", table_name="task")
+    op.drop_index("ix_task_title_id", table_name="task")
+    op.drop_index("ix_task_created_at_id", table_name="task")
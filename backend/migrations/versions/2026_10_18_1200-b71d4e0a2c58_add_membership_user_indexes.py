@@ -0,0 +1,37 @@
+"""Add membership user indexes
+
+Revision ID: b71d4e0a2c58
+Revises: 8c2e5b7d9a13
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b71d4e0a2c58"
+down_revision: Union[str, None] = "8c2e5b7d9a13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_taskassignee_user_id_task_id",
+        "taskassignee",
+        ["user_id", "task_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_taskwatcher_user_id_task_id",
+        "taskwatcher",
+        ["user_id", "task_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_taskwatcher_user_id_task_id", table_name="taskwatcher")
+    op.drop_index("ix_taskassignee_user_id_task_id", table_name="taskassignee")
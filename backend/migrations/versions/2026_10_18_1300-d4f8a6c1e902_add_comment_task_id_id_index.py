@@ -0,0 +1,25 @@
+"""Add comment task_id id index
+
+Revision ID: d4f8a6c1e902
+Revises: b71d4e0a2c58
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d4f8a6c1e902"
+down_revision: Union[str, None] = "b71d4e0a2c58"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_comment_task_id_id", "comment", ["task_id", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_comment_task_id_id", table_name="comment")
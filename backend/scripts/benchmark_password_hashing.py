@@ -0,0 +1,105 @@
+"""
+Бенчмарк влияния проверки паролей на остальные запросы.
+
+Запускает приложение с двумя обработчиками входа (прежний с синхронным
+вызовом bcrypt и новый через пул PasswordHasher) и легким /ping. Во время
+волны одновременных входов измеряет задержку /ping и печатает p50/p99.
+
+Запуск из каталога backend:
+
+    poetry run python scripts/benchmark_password_hashing.py
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from app.core.security import password_hasher, verify_password  # noqa: E402
+from app.core.security.password import pwd_context  # noqa: E402
+
+PASSWORD = "correct horse battery staple"
+LOGINS = 20
+CONCURRENCY = 8
+PING_INTERVAL = 0.01
+
+HASHED_PASSWORD = pwd_context.hash(PASSWORD)
+
+app = FastAPI()
+
+
+@app.get("/ping")
+async def ping() -> dict:
+    return {"ok": True}
+
+
+@app.post("/login/legacy")
+async def login_legacy() -> dict:
+    return {"ok": pwd_context.verify(PASSWORD, HASHED_PASSWORD)}
+
+
+@app.post("/login")
+async def login() -> dict:
+    return {"ok": await verify_password(PASSWORD, HASHED_PASSWORD)}
+
+
+async def storm(client: httpx.AsyncClient, path: str) -> None:
+    """Волна входов с ограниченным числом одновременных клиентов"""
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def one() -> None:
+        async with semaphore:
+            await client.post(path)
+
+    await asyncio.gather(*(one() for _ in range(LOGINS)))
+
+
+async def measure(client: httpx.AsyncClient, path: str) -> list[float]:
+    """
+    Задержки /ping в миллисекундах, пока идет волна входов.
+    Задержка считается от запланированного момента отправки, поэтому время,
+    на которое цикл событий был заблокирован, тоже попадает в измерение.
+    """
+    latencies: list[float] = []
+    storm_task = asyncio.create_task(storm(client, path))
+    scheduled = time.perf_counter()
+    while not storm_task.done():
+        scheduled += PING_INTERVAL
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+        await client.get("/ping")
+        latencies.append((time.perf_counter() - scheduled) * 1000)
+        scheduled = max(scheduled, time.perf_counter())
+    await storm_task
+    return latencies
+
+
+def percentile(values: list[float], q: int) -> float:
+    return statistics.quantiles(values, n=100)[q - 1] if len(values) > 1 else values[0]
+
+
+async def main() -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        for name, path in (("legacy", "/login/legacy"), ("thread pool", "/login")):
+            started = time.perf_counter()
+            latencies = await measure(client, path)
+            elapsed = time.perf_counter() - started
+            print(
+                f"{name:>11}: {LOGINS} logins in {elapsed:5.2f} s, "
+                f"/ping p50 {percentile(latencies, 50):7.2f} ms, "
+                f"p99 {percentile(latencies, 99):7.2f} ms, "
+                f"samples {len(latencies)}"
+            )
+    print(f"password hasher: {password_hasher.stats()}")
+    password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,143 @@
+"""
+Микробенчмарк сериализации списков задач.
+
+Сравнивает прежний путь (построение TaskDetail для каждой задачи, валидация
+по response_model и json.dumps в JSONResponse) с однопроходной сериализацией
+через TypeAdapter и проверяет, что оба пути дают одинаковые байты.
+
+Запуск из каталога backend:
+
+    poetry run python scripts/benchmark_serialization.py
+"""
+import asyncio
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+from app.api.endpoints.tasks import TaskListResponse, render_task_list  # noqa: E402
+from app.models import Task, TaskAssignee, TaskStatus, TaskWatcher, User  # noqa: E402
+from app.schemas import TaskDetail  # noqa: E402
+from app.services import status_registry  # noqa: E402
+
+TEAM_SIZE = 30
+STATUSES = ["Backlog", "To Do", "In Progress", "Review", "Done"]
+
+
+def make_tasks(count: int) -> list[Task]:
+    """Создает задачи с типичным числом исполнителей и наблюдателей"""
+    now = datetime(2025, 4, 1, 12, 0, 0)
+    users = [
+        User(
+            id=i,
+            email=f"user{i}@example.com",
+            username=f"user{i}",
+            first_name="Имя",
+            last_name=f"Фамилия {i}",
+            is_active=True,
+            is_superuser=False,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(1, TEAM_SIZE + 1)
+    ]
+    statuses = [
+        TaskStatus(id=i, title=title, description=None, created_at=now)
+        for i, title in enumerate(STATUSES, start=1)
+    ]
+    # Новый путь берет статусы из кэша процесса
+    for status in statuses:
+        status_registry.put(status)
+
+    tasks = []
+    for i in range(1, count + 1):
+        creator = users[i % TEAM_SIZE]
+        status = statuses[i % len(statuses)]
+        task = Task(
+            id=i,
+            title=f"Задача {i}",
+            description="Описание задачи " * 5,
+            creator_id=creator.id,
+            status_id=status.id,
+            created_at=now + timedelta(minutes=i),
+            updated_at=now + timedelta(minutes=i, seconds=30),
+        )
+        task.creator = creator
+        task.status = status
+        task.assignees = []
+        task.watchers = []
+        for offset in (1, 2):
+            assignee = TaskAssignee(
+                task_id=i, user_id=users[(i + offset) % TEAM_SIZE].id
+            )
+            assignee.user = users[(i + offset) % TEAM_SIZE]
+            task.assignees.append(assignee)
+        for offset in (3, 4, 5):
+            watcher = TaskWatcher(task_id=i, user_id=users[(i + offset) % TEAM_SIZE].id)
+            watcher.user = users[(i + offset) % TEAM_SIZE]
+            task.watchers.append(watcher)
+        tasks.append(task)
+    return tasks
+
+
+def legacy_task_to_detail(t: Task) -> TaskDetail:
+    """Прежнее построение TaskDetail с вложенными ORM объектами"""
+    return TaskDetail(
+        id=t.id,
+        title=t.title,
+        description=t.description,
+        creator=t.creator,
+        status=t.status,
+        assignees=[assignee.user for assignee in t.assignees],
+        watchers=[watcher.user for watcher in t.watchers],
+        created_at=t.created_at,
+        updated_at=t.updated_at,
+        status_id=t.status_id,
+        creator_id=t.creator_id,
+    )
+
+
+def main() -> None:
+    field = create_response_field(
+        name="Response_read_tasks", type_=TaskListResponse, mode="serialization"
+    )
+    loop = asyncio.new_event_loop()
+
+    def legacy(tasks: list[Task]) -> bytes:
+        content = loop.run_until_complete(
+            serialize_response(
+                field=field,
+                response_content=[legacy_task_to_detail(t) for t in tasks],
+            )
+        )
+        return JSONResponse(content).body
+
+    def fast(tasks: list[Task]) -> bytes:
+        return render_task_list(tasks, "detail", None).body
+
+    for count in (100, 1000):
+        tasks = make_tasks(count)
+        if legacy(tasks) != fast(tasks):
+            raise SystemExit(f"Outputs differ for {count} tasks")
+
+        number = max(1, 2000 // count)
+        legacy_time = min(timeit.repeat(lambda: legacy(tasks), number=number, repeat=5))
+        fast_time = min(timeit.repeat(lambda: fast(tasks), number=number, repeat=5))
+        legacy_ms = legacy_time / number * 1000
+        fast_ms = fast_time / number * 1000
+        print(
+            f"{count:>5} tasks: legacy {legacy_ms:8.2f} ms, "
+            f"type adapter {fast_ms:8.2f} ms, speedup x{legacy_ms / fast_ms:.1f}"
+        )
+
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Сравнение кодеков WebSocket на истории комментариев.
+
+Строит страницы истории из комментариев с типичными текстами и упоминаниями
+через comment_to_dict и для JSON и MessagePack (taskflow.msgpack.v1)
+печатает размер кадра, размер после deflate (как при permessage-deflate)
+и время кодирования и декодирования одного кадра.
+
+Запуск из каталога backend:
+
+    poetry run python scripts/benchmark_websocket_codecs.py
+"""
+import os
+import sys
+import timeit
+import zlib
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.api.websockets.chat import comment_to_dict  # noqa: E402
+from app.api.websockets.codecs import CODECS, JSON_CODEC, MsgpackCodec  # noqa: E402
+from app.models import Comment, CommentMention, User  # noqa: E402
+
+TEAM_SIZE = 12
+TEXTS = [
+    "Посмотрел логи, ошибка воспроизводится только на проде.",
+    "Ок",
+    "Перенес в ревью, нужен еще один аппрув. Проверьте, пожалуйста, миграцию "
+    "и обработку пустого списка исполнителей.",
+    "Откатили релиз, подробности в инциденте.",
+    "Согласен, давайте так и сделаем, но после демо в четверг.",
+]
+
+
+def make_history(count: int) -> dict:
+    """Сообщение history из count комментариев"""
+    now = datetime(2025, 4, 1, 12, 0, 0)
+    users = [User(id=i, username=f"user{i}") for i in range(1, TEAM_SIZE + 1)]
+    comments = []
+    for i in range(1, count + 1):
+        created_at = now + timedelta(minutes=i, microseconds=i * 137)
+        comment = Comment(
+            id=i,
+            task_id=1,
+            author_id=users[i % TEAM_SIZE].id,
+            text=TEXTS[i % len(TEXTS)],
+            attachment_path=None,
+            created_at=created_at,
+            updated_at=created_at + timedelta(seconds=i % 3 * 40),
+            is_edited=i % 3 == 0,
+        )
+        comment.author = users[i % TEAM_SIZE]
+        comment.mentions = []
+        for offset in range(i % 3):
+            mention = CommentMention(user_id=users[(i + offset + 1) % TEAM_SIZE].id)
+            mention.user = users[(i + offset + 1) % TEAM_SIZE]
+            comment.mentions.append(mention)
+        comments.append(comment_to_dict(comment))
+    return {"type": "history", "data": comments, "since_id": None, "has_more": True}
+
+
+def main() -> None:
+    codecs = {"json": JSON_CODEC, "msgpack": CODECS[MsgpackCodec.subprotocol]}
+
+    for count in (1, 50, 500):
+        message = make_history(count)
+        number = max(1, 5000 // count)
+        print(f"history of {count} comments:")
+        for name, codec in codecs.items():
+            frame = codec.encode(message)
+            raw = frame.encode() if isinstance(frame, str) else frame
+            encode = min(
+                timeit.repeat(lambda: codec.encode(message), number=number, repeat=5)
+            )
+            decode = min(
+                timeit.repeat(lambda: codec.decode(frame), number=number, repeat=5)
+            )
+            print(
+                f"  {name:>7}: {len(raw):>7} bytes, "
+                f"deflate {len(zlib.compress(raw)):>6} bytes, "
+                f"encode {encode / number * 1e6:8.1f} us, "
+                f"decode {decode / number * 1e6:8.1f} us"
+            )
+
+
+if __name__ == "__main__":
+    main()
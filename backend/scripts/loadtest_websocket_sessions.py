@@ -0,0 +1,128 @@
+"""
+Нагрузочный тест: простаивающие WebSocket соединения не занимают пул базы данных.
+
+Открывает много соединений к комментариям задачи, дожидается истории на каждом
+и, пока все они открыты, проверяет, что REST запросы и новые комментарии
+обслуживаются без ожидания соединения из пула. Если бы сокет держал сессию
+все время жизни, при пуле из 10 соединений уже одиннадцатый клиент ждал бы
+pool_timeout.
+
+Сервер запускается отдельно с маленьким пулом, из каталога backend:
+
+    DB_POOL_SIZE=10 DB_MAX_OVERFLOW=0 poetry run uvicorn app.main:app --port 8000
+
+Затем (токен - JWT пользователя с доступом к задаче):
+
+    ulimit -n 4096
+    poetry run python scripts/loadtest_websocket_sessions.py --token <JWT> --task-id 1
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+import websockets
+
+
+async def open_socket(url: str) -> websockets.WebSocketClientProtocol:
+    """Подключение и ожидание кадра с историей комментариев"""
+    socket = await websockets.connect(url, open_timeout=30, max_size=None)
+    message = json.loads(await asyncio.wait_for(socket.recv(), timeout=30))
+    if message.get("type") != "history":
+        raise RuntimeError(f"Unexpected first message: {message.get('type')}")
+    return socket
+
+
+def is_comment_frame(message: dict) -> bool:
+    """Кадр с новым комментарием, в том числе внутри пакета batch"""
+    if message.get("type") == "batch":
+        return any(event.get("type") == "new_comment" for event in message["events"])
+    return message.get("type") == "new_comment"
+
+
+async def wait_for_comment(
+    socket: websockets.WebSocketClientProtocol, timeout: float
+) -> bool:
+    """
+    Ожидание кадра с комментарием. Служебные ping сервера и события набора
+    пропускаются и не считаются доставкой, на ping отвечаем pong
+    """
+    deadline = time.perf_counter() + timeout
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return False
+        try:
+            message = json.loads(await asyncio.wait_for(socket.recv(), remaining))
+        except asyncio.TimeoutError:
+            return False
+        if is_comment_frame(message):
+            return True
+        if message.get("type") == "ping":
+            await socket.send(json.dumps({"type": "pong"}))
+
+
+async def timed_get(client: httpx.AsyncClient, path: str) -> float:
+    """Время ответа REST запроса в миллисекундах"""
+    started = time.perf_counter()
+    response = await client.get(path)
+    response.raise_for_status()
+    return (time.perf_counter() - started) * 1000
+
+
+async def main(args: argparse.Namespace) -> None:
+    ws_base = args.base_url.replace("http", "ws", 1)
+    url = f"{ws_base}/api/v1/tasks/{args.task_id}/comments?token={args.token}"
+
+    started = time.perf_counter()
+    sockets = []
+    for offset in range(0, args.sockets, args.batch):
+        batch = min(args.batch, args.sockets - offset)
+        sockets += await asyncio.gather(*(open_socket(url) for _ in range(batch)))
+    print(f"Opened {len(sockets)} sockets in {time.perf_counter() - started:.1f}s")
+
+    headers = {"Authorization": f"Bearer {args.token}"}
+    async with httpx.AsyncClient(
+        base_url=args.base_url, headers=headers, timeout=args.timeout
+    ) as client:
+        # Больше параллельных запросов, чем соединений в пуле
+        latencies = await asyncio.gather(
+            *(
+                timed_get(client, f"/api/v1/tasks/{args.task_id}")
+                for _ in range(args.requests)
+            )
+        )
+    latencies.sort()
+    print(
+        f"REST with {len(sockets)} idle sockets: {len(latencies)} requests, "
+        f"p50 {statistics.median(latencies):.1f} ms, "
+        f"p99 {latencies[int(len(latencies) * 0.99) - 1]:.1f} ms"
+    )
+
+    # Комментарий через один сокет доходит до всех остальных
+    started = time.perf_counter()
+    await sockets[0].send(json.dumps({"text": "load test"}))
+    received = await asyncio.gather(
+        *(wait_for_comment(socket, args.timeout) for socket in sockets)
+    )
+    delivered = sum(received)
+    print(
+        f"Comment delivered to {delivered}/{len(sockets)} sockets "
+        f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+    )
+
+    await asyncio.gather(*(socket.close() for socket in sockets))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--token", required=True)
+    parser.add_argument("--task-id", type=int, required=True)
+    parser.add_argument("--sockets", type=int, default=1000)
+    parser.add_argument("--batch", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,104 @@
+"""
+Отчет о стоимости хэшей паролей в таблице user.
+
+Печатает распределение хэшей по схеме и стоимости (rounds), число хэшей,
+которые будут пересчитаны при следующем входе, число нераспознанных хэшей
+и измеренное время проверки пароля для каждой встреченной стоимости и для
+текущих настроек.
+
+Запуск из каталога backend:
+
+    poetry run python scripts/password_hash_report.py
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from typing import Iterable, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.security import pwd_context  # noqa: E402
+from app.db.session import AsyncSessionLocal  # noqa: E402
+from app.models import User  # noqa: E402
+
+SAMPLE_PASSWORD = "password-hash-report"
+REPEAT = 5
+
+
+def describe(hashed_password: str) -> Tuple[str, Optional[int]]:
+    """Схема и стоимость хэша, unknown - для нераспознанных и поврежденных"""
+    scheme = pwd_context.identify(hashed_password)
+    if scheme is None:
+        return "unknown", None
+    try:
+        parsed = pwd_context.handler(scheme).from_string(hashed_password)
+    except ValueError:
+        return "unknown", None
+    return scheme, getattr(parsed, "rounds", None)
+
+
+def count_outdated(hashes: Iterable[str]) -> Tuple[int, int]:
+    """
+    Число хэшей, которые будут пересчитаны при следующем входе, и число
+    нераспознанных хэшей: needs_update для них выбрасывает исключение
+    """
+    outdated = unknown = 0
+    for hashed_password in hashes:
+        if describe(hashed_password)[0] == "unknown":
+            unknown += 1
+        elif pwd_context.needs_update(hashed_password):
+            outdated += 1
+    return outdated, unknown
+
+
+def verify_time_ms(scheme: str, rounds: Optional[int]) -> float:
+    """Медиана времени проверки пароля для схемы и стоимости"""
+    handler = pwd_context.handler(scheme)
+    if rounds is not None:
+        handler = handler.using(rounds=rounds)
+    hashed_password = handler.hash(SAMPLE_PASSWORD)
+    timings = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        handler.verify(SAMPLE_PASSWORD, hashed_password)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+async def main() -> None:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(User.hashed_password))
+        hashes = result.scalars().all()
+
+    distribution = Counter(describe(hashed_password) for hashed_password in hashes)
+    outdated, unknown = count_outdated(hashes)
+
+    current = describe(pwd_context.hash(SAMPLE_PASSWORD))
+    print(
+        f"Current settings: scheme {settings.PASSWORD_HASH_SCHEME}, "
+        f"rounds {current[1]}"
+    )
+    print(
+        f"Users: {len(hashes)}, will be rehashed on login: {outdated}, "
+        f"unrecognized hashes: {unknown}"
+    )
+    print(f"{'scheme':<16}{'rounds':>8}{'users':>8}{'verify, ms':>12}")
+    for (scheme, rounds), count in sorted(
+        distribution.items(), key=lambda item: (item[0][0], item[0][1] or 0)
+    ):
+        verify_ms = verify_time_ms(scheme, rounds) if scheme != "unknown" else 0.0
+        marker = " *" if (scheme, rounds) == current else ""
+        print(f"{scheme:<16}{rounds or '-':>8}{count:>8}{verify_ms:>12.1f}{marker}")
+    if current not in distribution:
+        verify_ms = verify_time_ms(*current)
+        print(f"{current[0]:<16}{current[1] or '-':>8}{0:>8}{verify_ms:>12.1f} *")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
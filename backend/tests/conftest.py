@@ -0,0 +1,61 @@
+import asyncio
+from typing import AsyncIterator
+
+import asyncpg
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+import app.models  # noqa: F401  регистрация моделей в Base.metadata
+from app.core.config import settings
+from app.db.base_class import Base
+
+# Отдельная база, чтобы тесты не трогали данные разработки
+TEST_DB = f"{settings.POSTGRES_DB}_test"
+TEST_DATABASE_URI = settings.DATABASE_URI.rsplit("/", 1)[0] + f"/{TEST_DB}"
+
+
+async def _recreate_database() -> None:
+    """Пересоздание тестовой базы и схемы по моделям"""
+    connection = await asyncpg.connect(
+        host=settings.POSTGRES_HOST,
+        port=int(settings.POSTGRES_PORT),
+        user=settings.POSTGRES_USER,
+        password=settings.POSTGRES_PASSWORD,
+        database=settings.POSTGRES_DB,
+    )
+    try:
+        await connection.execute(f'DROP DATABASE IF EXISTS "{TEST_DB}" WITH (FORCE)')
+        await connection.execute(f'CREATE DATABASE "{TEST_DB}"')
+    finally:
+        await connection.close()
+
+    engine = create_async_engine(TEST_DATABASE_URI, poolclass=NullPool)
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.run_sync(Base.metadata.create_all)
+    await engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def postgres() -> str:
+    """URI тестовой базы, тесты пропускаются, если Postgres недоступен"""
+    try:
+        asyncio.run(_recreate_database())
+    except (OSError, asyncpg.PostgresError) as e:
+        pytest.skip(f"Postgres is not available: {e}")
+    return TEST_DATABASE_URI
+
+
+@pytest.fixture
+async def db(postgres: str) -> AsyncIterator[AsyncSession]:
+    """Сессия тестовой базы, после теста все таблицы очищаются"""
+    engine = create_async_engine(postgres, poolclass=NullPool)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        yield session
+    tables = ", ".join(f'"{table.name}"' for table in Base.metadata.sorted_tables)
+    async with engine.begin() as conn:
+        await conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+    await engine.dispose()
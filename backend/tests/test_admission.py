@@ -0,0 +1,43 @@
+import pytest
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.services import admission
+
+
+def make_request(host: str, real_ip: str) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "POST",
+            "path": "/api/v1/auth/login",
+            "headers": [(b"x-real-ip", real_ip.encode())],
+            "client": (host, 50000),
+        }
+    )
+
+
+@pytest.fixture
+def behind_proxy(monkeypatch):
+    monkeypatch.setattr(settings, "CLIENT_IP_HEADER", "X-Real-IP")
+    monkeypatch.setattr(
+        admission, "_trusted_proxies", admission._networks(["172.16.0.0/12"])
+    )
+
+
+def test_header_is_ignored_by_default():
+    request = make_request("203.0.113.5", "198.51.100.1")
+
+    assert admission.client_ip(request) == "203.0.113.5"
+
+
+def test_header_from_trusted_proxy_is_used(behind_proxy):
+    request = make_request("172.18.0.3", "198.51.100.1")
+
+    assert admission.client_ip(request) == "198.51.100.1"
+
+
+def test_header_from_untrusted_client_is_ignored(behind_proxy):
+    request = make_request("203.0.113.5", "198.51.100.1")
+
+    assert admission.client_ip(request) == "203.0.113.5"
@@ -0,0 +1,202 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from starlette.websockets import WebSocketState
+
+from app.api.websockets.broker import Broker, PostgresBroker
+from app.api.websockets.chat import ConnectionManager
+
+
+async def _ignore(task_id, message, exclude_user_id):
+    pass
+
+
+def make_chunks(payload: str, max_payload: int = 64) -> list:
+    broker = PostgresBroker(_ignore)
+    broker.max_payload = max_payload
+    return broker._split(payload)
+
+
+def test_broker_is_abstract():
+    with pytest.raises(TypeError):
+        Broker(_ignore)
+
+
+def test_short_payload_is_sent_whole():
+    broker = PostgresBroker(_ignore)
+
+    chunks = broker._split('{"a":1}')
+
+    assert chunks == ['-{"a":1}']
+    assert broker._join(chunks[0]) == '{"a":1}'
+
+
+def test_long_payload_is_split_and_joined_in_order():
+    payload = json.dumps({"text": "комментарий " * 40}, ensure_ascii=False)
+    chunks = make_chunks(payload)
+    broker = PostgresBroker(_ignore)
+
+    assert len(chunks) > 1
+    assert all(len(chunk.encode()) <= 64 + 48 for chunk in chunks)
+    assert [broker._join(chunk) for chunk in chunks[:-1]] == [None] * (len(chunks) - 1)
+    assert broker._join(chunks[-1]) == payload
+    assert broker._chunks == {}
+
+
+def test_chunks_out_of_order_are_joined():
+    payload = "x" * 200
+    chunks = make_chunks(payload)
+    broker = PostgresBroker(_ignore)
+
+    results = [broker._join(chunk) for chunk in reversed(chunks)]
+
+    assert results[:-1] == [None] * (len(chunks) - 1)
+    assert results[-1] == payload
+
+
+def test_incomplete_chunks_are_not_delivered():
+    chunks = make_chunks("y" * 200)
+    broker = PostgresBroker(_ignore)
+
+    results = [broker._join(chunk) for chunk in chunks[1:]]
+
+    assert results == [None] * (len(chunks) - 1)
+    assert len(broker._chunks) == 1
+
+
+def test_interleaved_messages_are_joined_separately():
+    first, second = "a" * 150, "b" * 150
+    broker = PostgresBroker(_ignore)
+    first_chunks, second_chunks = make_chunks(first), make_chunks(second)
+
+    results = []
+    for pair in zip(first_chunks, second_chunks):
+        results += [broker._join(chunk) for chunk in pair]
+
+    assert [result for result in results if result] == [first, second]
+
+
+@pytest.fixture
+async def test_engine(postgres):
+    """Движок тестовой базы, уведомления NOTIFY не выходят за ее пределы"""
+    engine = create_async_engine(postgres, poolclass=NullPool)
+    yield engine
+    await engine.dispose()
+
+
+class FakeWebSocket:
+    """Принятый сокет, который запоминает отправленные JSON сообщения"""
+
+    def __init__(self):
+        self.scope = {"subprotocols": []}
+        self.client_state = WebSocketState.CONNECTED
+        self.sent = []
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, data: str) -> None:
+        self.sent.append(json.loads(data))
+
+    async def close(self, code: int, reason: str) -> None:
+        self.client_state = WebSocketState.DISCONNECTED
+
+
+async def _wait_listening(publisher: PostgresBroker, received: dict) -> None:
+    """Публикация пробных сообщений, пока их не получат все брокеры"""
+    for _ in range(100):
+        await publisher.publish(0, {"type": "probe"})
+        await asyncio.sleep(0.05)
+        if all(messages for messages in received.values()):
+            break
+    else:
+        raise AssertionError("Brokers did not start listening")
+    # Пробные сообщения, отправленные до подписки второго брокера, уже не придут
+    await asyncio.sleep(0.1)
+    for messages in received.values():
+        messages.clear()
+
+
+async def test_two_brokers_deliver_each_publication(test_engine):
+    received = {"first": [], "second": []}
+
+    def collector(name):
+        async def deliver(task_id, message, exclude_user_id):
+            received[name].append((task_id, message, exclude_user_id))
+
+        return deliver
+
+    first = PostgresBroker(collector("first"), test_engine)
+    second = PostgresBroker(collector("second"), test_engine)
+    await first.start()
+    await second.start()
+    try:
+        await _wait_listening(first, received)
+
+        small = {"type": "typing", "user_id": 1}
+        large = {"type": "new_comment", "data": {"text": "т" * 20000}}
+        await first.publish(7, small, 1)
+        await second.publish(7, large)
+
+        for _ in range(100):
+            if all(len(messages) == 2 for messages in received.values()):
+                break
+            await asyncio.sleep(0.05)
+
+        expected = [(7, small, 1), (7, large, None)]
+        assert received["first"] == expected
+        assert received["second"] == expected
+    finally:
+        await first.stop()
+        await second.stop()
+
+
+async def test_comment_broadcast_reaches_subscriber_of_another_instance(test_engine):
+    instances = [
+        ConnectionManager(lambda deliver: PostgresBroker(deliver, test_engine))
+        for _ in range(2)
+    ]
+    first, second = instances
+    for manager in instances:
+        await manager.start()
+    try:
+        sockets = {}
+        for user_id, manager in ((2, first), (3, second)):
+            sockets[user_id] = FakeWebSocket()
+            connection = await manager.connect(sockets[user_id], user_id)
+            manager.subscribe(connection, 7)
+
+        # Пробные сообщения, пока оба экземпляра не начнут слушать канал
+        for _ in range(100):
+            await first.broadcast({"type": "probe"}, task_id=7)
+            await asyncio.sleep(0.05)
+            if all(websocket.sent for websocket in sockets.values()):
+                break
+        else:
+            raise AssertionError("Instances did not start listening")
+        await asyncio.sleep(0.1)
+        for websocket in sockets.values():
+            websocket.sent.clear()
+
+        comment = {"id": 1, "task_id": 7, "text": "т" * 10000}
+        await first.broadcast(
+            {"type": "new_comment", "data": comment}, task_id=7, exclude_user_id=2
+        )
+        for _ in range(100):
+            if sockets[3].sent:
+                break
+            await asyncio.sleep(0.05)
+        await asyncio.sleep(0.1)
+
+        assert sockets[3].sent == [
+            {"type": "new_comment", "data": comment, "task_id": 7}
+        ]
+        assert sockets[2].sent == []
+    finally:
+        for manager in instances:
+            for connection in manager.connections():
+                await connection.close()
+            await manager.stop()
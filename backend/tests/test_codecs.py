@@ -0,0 +1,39 @@
+import pytest
+
+from app.api.websockets.codecs import (
+    CODECS,
+    JSON_CODEC,
+    Codec,
+    MsgpackCodec,
+    select_codec,
+)
+
+MSGPACK_CODEC = CODECS[MsgpackCodec.subprotocol]
+
+
+def test_codec_is_abstract():
+    with pytest.raises(TypeError):
+        Codec()
+
+
+def test_json_is_default_codec():
+    assert select_codec([]) is JSON_CODEC
+    assert select_codec(["unknown"]) is JSON_CODEC
+    assert select_codec(["unknown", MsgpackCodec.subprotocol]) is MSGPACK_CODEC
+
+
+def test_msgpack_timestamps_are_milliseconds():
+    message = {"type": "new_comment", "data": {"created_at": "1970-01-01T00:00:01.5"}}
+
+    decoded = MSGPACK_CODEC.decode(MSGPACK_CODEC.encode(message))
+
+    assert decoded == {"type": "new_comment", "data": {"created_at": 1500}}
+
+
+@pytest.mark.parametrize("codec", [JSON_CODEC, MSGPACK_CODEC])
+def test_batch_contains_encoded_events(codec):
+    events = [{"type": "typing", "user_id": 1}, {"type": "typing", "user_id": 2}]
+
+    batch = codec.encode_batch([codec.encode(event) for event in events])
+
+    assert codec.decode(batch) == {"type": "batch", "events": events}
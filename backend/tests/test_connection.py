@@ -0,0 +1,51 @@
+import asyncio
+
+from starlette.websockets import WebSocketState
+
+from app.api.websockets.connection import Connection
+
+
+class FakeWebSocket:
+    """Сокет, который не пишет кадры, пока не открыт gate"""
+
+    def __init__(self):
+        self.client_state = WebSocketState.CONNECTED
+        self.gate = asyncio.Event()
+        self.sent = []
+        self.closed_with = []
+
+    async def send_text(self, data: str) -> None:
+        await self.gate.wait()
+        self.sent.append(data)
+
+    async def send_bytes(self, data: bytes) -> None:
+        await self.gate.wait()
+        self.sent.append(data)
+
+    async def close(self, code: int, reason: str) -> None:
+        self.closed_with.append((code, reason))
+
+
+async def test_queued_bytes_counts_encoded_size():
+    connection = Connection(FakeWebSocket(), user_id=1, max_queue=10)
+
+    connection.send_frame("abc")
+    connection.send_frame("где")
+    connection.send_frame(b"\x01\x02")
+
+    assert connection.queued_bytes == 3 + 6 + 2
+
+
+async def test_slow_consumer_is_closed_once():
+    websocket = FakeWebSocket()
+    connection = Connection(websocket, user_id=1, max_queue=2)
+
+    assert connection.send_frame("1")
+    assert connection.send_frame("2")
+    assert not connection.send_frame("3")
+    assert not connection.send_frame("4")
+    await connection._close_task
+
+    assert websocket.closed_with == [(1013, "slow_consumer")]
+    assert connection.close_reason == "slow_consumer"
+    assert connection.queued_bytes == 0
@@ -0,0 +1,137 @@
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import task as crud_task
+from app.crud.crud_task import _task_conditions, _user_task_ids
+from app.models import Task, TaskAssignee, TaskWatcher, User
+from app.schemas import TaskFilter
+
+
+async def seed_tasks(db: AsyncSession) -> dict:
+    """
+    Пользователь owner создал одну задачу, назначен на вторую, наблюдает за
+    третьей и связан с четвертой всеми тремя способами. Пятая задача чужая.
+    """
+    owner = User(email="owner@example.com", username="owner", hashed_password="x")
+    other = User(email="other@example.com", username="other", hashed_password="x")
+    db.add_all([owner, other])
+    await db.flush()
+
+    owned = Task(title="owned", creator_id=owner.id)
+    assigned = Task(title="assigned", creator_id=other.id)
+    watched = Task(title="watched", creator_id=other.id)
+    everything = Task(title="everything", creator_id=owner.id)
+    foreign = Task(title="foreign", creator_id=other.id)
+    db.add_all([owned, assigned, watched, everything, foreign])
+    await db.flush()
+
+    db.add_all(
+        [
+            TaskAssignee(task_id=assigned.id, user_id=owner.id),
+            TaskWatcher(task_id=watched.id, user_id=owner.id),
+            TaskAssignee(task_id=everything.id, user_id=owner.id),
+            TaskWatcher(task_id=everything.id, user_id=owner.id),
+            TaskAssignee(task_id=foreign.id, user_id=other.id),
+            TaskWatcher(task_id=foreign.id, user_id=other.id),
+        ]
+    )
+    await db.commit()
+    return {
+        "owner": owner.id,
+        "user_tasks": {owned.id, assigned.id, watched.id, everything.id},
+        "foreign": foreign.id,
+    }
+
+
+async def test_user_tasks_returns_each_related_task_once(db: AsyncSession):
+    seeded = await seed_tasks(db)
+
+    tasks = await crud_task.get_user_tasks(db, user_id=seeded["owner"])
+
+    ids = [t.id for t in tasks]
+    assert len(ids) == len(set(ids))
+    assert set(ids) == seeded["user_tasks"]
+
+
+SEED_STATEMENTS = [
+    """
+    INSERT INTO "user" (email, username, hashed_password, is_active, is_superuser)
+    SELECT 'user' || i || '@example.com', 'user' || i, 'x', true, false
+    FROM generate_series(1, 500) i
+    """,
+    """
+    INSERT INTO task (title, creator_id, created_at, updated_at)
+    SELECT 'Задача ' || i || ' ' || md5(i::text), 1 + i % 500,
+           now() - i * interval '1 minute', now() - i * interval '1 minute'
+    FROM generate_series(1, 100000) i
+    """,
+    """
+    INSERT INTO taskassignee (task_id, user_id)
+    SELECT id, 1 + id * 7 % 500 FROM task WHERE id <= 50000
+    """,
+    """
+    INSERT INTO taskwatcher (task_id, user_id)
+    SELECT id, 1 + id * 17 % 500 FROM task WHERE id <= 50000
+    """,
+]
+
+
+async def seed_realistic_tasks(db: AsyncSession) -> None:
+    """
+    100 тысяч задач 500 пользователей, у первых 50 тысяч задач по одному
+    исполнителю и наблюдателю. Индексы строятся после загрузки: так быстрее,
+    чем обновлять их на каждой вставке, а определения берутся из моделей.
+    """
+    indexes = [
+        index
+        for model in (Task, TaskAssignee, TaskWatcher)
+        for index in model.__table__.indexes
+    ]
+    conn = await db.connection()
+    for index in indexes:
+        await conn.run_sync(index.drop)
+    for statement in SEED_STATEMENTS:
+        await db.execute(text(statement))
+    # DDL в Postgres транзакционный: при ошибке удаленные индексы вернутся
+    for index in indexes:
+        await conn.run_sync(index.create)
+    await db.execute(text("ANALYZE"))
+    await db.commit()
+
+
+async def explain(db: AsyncSession, query) -> str:
+    compiled = query.compile(
+        dialect=db.bind.dialect, compile_kwargs={"literal_binds": True}
+    )
+    result = await db.execute(text(f"EXPLAIN {compiled}"))
+    return "\n".join(row[0] for row in result)
+
+
+def assert_index_scans(plan: str, *indexes: str) -> None:
+    for index in indexes:
+        scans = [line for line in plan.splitlines() if index in line]
+        assert scans, f"{index} is not used:\n{plan}"
+        assert all("Index" in line or "Bitmap" in line for line in scans), plan
+
+
+async def test_planner_picks_new_indexes_on_realistic_data(db: AsyncSession):
+    await seed_realistic_tasks(db)
+
+    # Страница задач пользователя, как в get_user_tasks
+    task_ids = _user_task_ids(42)
+    user_tasks = crud_task.paginate(
+        select(Task).join(task_ids, Task.id == task_ids.c.task_id), limit=100
+    )
+    assert_index_scans(
+        await explain(db, user_tasks),
+        "ix_task_creator_id_updated_at_id",
+        "ix_taskassignee_user_id_task_id",
+        "ix_taskwatcher_user_id_task_id",
+    )
+
+    # Поиск по подстроке названия, как в фильтре title
+    search = crud_task.paginate(
+        select(Task).where(*_task_conditions(TaskFilter(title="c4ca4238a0"))),
+        limit=100,
+    )
+    assert_index_scans(await explain(db, search), "ix_task_title_trgm")
@@ -0,0 +1,50 @@
+import base64
+from datetime import datetime
+
+import pytest
+
+from app.crud import InvalidCursorError, task as crud_task
+from app.models import Task
+
+
+def make_task() -> Task:
+    return Task(
+        id=42,
+        title="title",
+        created_at=datetime(2025, 1, 2, 3, 4, 5),
+        updated_at=datetime(2025, 2, 3, 4, 5, 6),
+    )
+
+
+def test_cursor_round_trip():
+    keyset = (("updated_at", "id"), True)
+
+    cursor = crud_task.encode_cursor(make_task(), keyset=keyset)
+
+    assert crud_task.decode_cursor(cursor, keyset=keyset) == [
+        datetime(2025, 2, 3, 4, 5, 6),
+        42,
+    ]
+
+
+@pytest.mark.parametrize(
+    "other",
+    [
+        (("updated_at", "id"), False),
+        (("created_at", "id"), True),
+        (("id",), True),
+    ],
+)
+def test_cursor_of_other_sort_order_is_rejected(other):
+    cursor = crud_task.encode_cursor(make_task(), keyset=(("updated_at", "id"), True))
+
+    with pytest.raises(InvalidCursorError, match="sort order"):
+        crud_task.decode_cursor(cursor, keyset=other)
+
+
+@pytest.mark.parametrize("raw", [b"not json", b"[1]", b'{"s":"id:asc"}'])
+def test_malformed_cursor_is_rejected(raw):
+    cursor = base64.urlsafe_b64encode(raw).decode()
+
+    with pytest.raises(InvalidCursorError):
+        crud_task.decode_cursor(cursor, keyset=(("id",), False))
@@ -0,0 +1,57 @@
+import asyncio
+
+from app.api.websockets.frames import HistoryCache
+
+
+def gated_loader():
+    """Загрузка истории, каждый вызов ждет своего события в gates"""
+    gates = []
+
+    async def load():
+        gate = asyncio.Event()
+        gates.append(gate)
+        await gate.wait()
+        return {"type": "history", "data": [len(gates)]}
+
+    return load, gates
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_concurrent_gets_load_once():
+    cache = HistoryCache(ttl=60)
+    load, gates = gated_loader()
+
+    first = asyncio.create_task(cache.get(1, load))
+    second = asyncio.create_task(cache.get(1, load))
+    await settle()
+    gates[0].set()
+
+    assert await first is await second
+    assert len(gates) == 1
+
+
+async def test_waiter_keeps_lock_after_invalidated_load():
+    cache = HistoryCache(ttl=60)
+    load, gates = gated_loader()
+
+    first = asyncio.create_task(cache.get(1, load))
+    second = asyncio.create_task(cache.get(1, load))
+    await settle()
+    cache.invalidate(1)
+    gates[0].set()
+    await first
+
+    # Второй ждет блокировку, новое подключение должно встать за ним,
+    # а не начать параллельную загрузку
+    third = asyncio.create_task(cache.get(1, load))
+    await settle()
+    assert len(gates) == 2
+
+    gates[1].set()
+    assert await third is await second
+    assert cache._locks == {}
+    assert cache._versions == {}
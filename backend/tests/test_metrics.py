@@ -0,0 +1,33 @@
+from fastapi.testclient import TestClient
+
+from app.api.dependencies.auth import get_current_superuser
+from app.main import app
+from app.models import User
+
+
+def test_metrics_require_authentication():
+    response = TestClient(app).get("/api/v1/metrics/")
+
+    assert response.status_code == 401
+
+
+def test_metrics_collect_all_stats():
+    app.dependency_overrides[get_current_superuser] = lambda: User(
+        id=1, is_superuser=True
+    )
+    try:
+        response = TestClient(app).get("/api/v1/metrics/")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    metrics = response.json()
+    assert set(metrics) == {
+        "websockets",
+        "user_cache",
+        "token_cache",
+        "credential_admission",
+        "password_hasher",
+    }
+    assert metrics["websockets"]["connections"] == 0
+    assert "hit_rate" in metrics["token_cache"]
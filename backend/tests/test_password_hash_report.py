@@ -0,0 +1,23 @@
+import importlib.util
+from pathlib import Path
+
+from passlib.hash import bcrypt
+
+from app.core.security import pwd_context
+
+spec = importlib.util.spec_from_file_location(
+    "password_hash_report",
+    Path(__file__).parent.parent / "scripts" / "password_hash_report.py",
+)
+report = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(report)
+
+
+def test_unknown_hashes_are_counted_separately():
+    current = pwd_context.hash("secret")
+    outdated = bcrypt.using(rounds=4).hash("secret")
+    hashes = [current, outdated, "plain-text-password", "$2b$12$broken"]
+
+    assert report.count_outdated(hashes) == (1, 2)
+    assert report.describe("plain-text-password") == ("unknown", None)
+    assert report.describe("$2b$12$broken") == ("unknown", None)
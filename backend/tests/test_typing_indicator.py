@@ -0,0 +1,39 @@
+import asyncio
+
+from app.api.websockets.typing_indicator import TypingThrottle
+
+
+async def test_idle_typing_broadcasts_stop_once():
+    stopped = []
+
+    async def on_stop(task_id, user_id, username):
+        stopped.append((task_id, user_id, username))
+
+    throttle = TypingThrottle(window=1, idle=0.01, on_stop=on_stop)
+    assert throttle.hit(5, 1, "a")
+    assert not throttle.hit(5, 1, "a")
+
+    await asyncio.sleep(0.05)
+
+    assert stopped == [(5, 1, "a")]
+    assert throttle._pending == set()
+
+
+async def test_shutdown_cancels_pending_broadcasts():
+    started = asyncio.Event()
+
+    async def on_stop(task_id, user_id, username):
+        started.set()
+        await asyncio.sleep(10)
+
+    throttle = TypingThrottle(window=1, idle=0.01, on_stop=on_stop)
+    throttle.hit(5, 1, "a")
+    throttle.hit(6, 1, "a")
+    await started.wait()
+    pending = set(throttle._pending)
+
+    throttle.shutdown()
+    await asyncio.sleep(0)
+
+    assert pending and all(task.cancelled() for task in pending)
+    assert throttle.stats()["typing_active"] == 0
@@ -0,0 +1,55 @@
+from app.api.websockets.chat import ConnectionManager
+from app.models import User
+from app.services import UserCache
+
+
+def make_user() -> User:
+    return User(
+        id=1,
+        email="user@example.com",
+        username="user",
+        hashed_password="x",
+        is_active=True,
+        is_superuser=True,
+    )
+
+
+async def test_invalidate_publishes_to_other_processes():
+    cache = UserCache(maxsize=10, ttl=60)
+    published = []
+
+    async def publish(user_id):
+        published.append(user_id)
+
+    cache.publish = publish
+    cache.put(make_user())
+
+    await cache.invalidate(1)
+
+    assert cache.stats()["size"] == 0
+    assert published == [1]
+
+
+async def test_failed_publish_still_discards_locally():
+    cache = UserCache(maxsize=10, ttl=60)
+
+    async def publish(user_id):
+        raise ConnectionError("broker is down")
+
+    cache.publish = publish
+    cache.put(make_user())
+
+    await cache.invalidate(1)
+
+    assert cache.stats()["size"] == 0
+
+
+async def test_manager_discards_user_on_invalidation_message(monkeypatch):
+    cache = UserCache(maxsize=10, ttl=60)
+    monkeypatch.setattr("app.api.websockets.chat.user_cache", cache)
+    cache.put(make_user())
+    manager = ConnectionManager()
+
+    await manager.publish_user_invalidation(1)
+
+    assert cache.stats()["size"] == 0
@@ -1,5 +1,5 @@
 import axios from 'axios';
-import { UserLoginData, UserRegisterData, TokenResponse, User, Task, TaskStatus, TaskCreate, TaskUpdate } from '../types';
+import { UserLoginData, UserRegisterData, TokenResponse, User, Task, TaskStatus, TaskCreate, TaskUpdate, TaskDashboard } from '../types';
 
 const API_URL = 'http://localhost:8080/api/v1';
 
@@ -63,6 +63,10 @@ const api = {
       const response = await apiClient.get('/tasks/watching');
       return response.data;
     },
+    getDashboard: async (): Promise<TaskDashboard> => {
+      const response = await apiClient.get('/tasks/dashboard');
+      return response.data;
+    },
     getById: async (id: number): Promise<Task> => {
       const response = await apiClient.get(`/tasks/${id}`);
       return response.data;
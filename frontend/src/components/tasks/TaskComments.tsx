@@ -30,7 +30,9 @@ const TaskComments = ({ taskId }: TaskCommentsProps) => {
     editComment,
     deleteComment,
     typingUsers, 
-    sendTypingNotification 
+    sendTypingNotification,
+    hasMore,
+    loadMore
   } = useTaskComments(taskId);
   
   // Скроллим контейнер комментариев только при первой загрузке
@@ -187,6 +189,13 @@ const TaskComments = ({ taskId }: TaskCommentsProps) => {
               </div>
             ) : comments.length > 0 ? (
               <>
+                {hasMore && (
+                  <div className="text-center mb-2">
+                    <Button variant="link" size="sm" onClick={loadMore}>
+                      Load earlier comments
+                    </Button>
+                  </div>
+                )}
                 {comments.map(comment => (
                   <CommentItem 
                     key={comment.id} 
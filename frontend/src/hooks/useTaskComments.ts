@@ -23,8 +23,11 @@ export interface CommentData {
 
 // Типы для WebSocket сообщений
 interface WebSocketMessage {
-  type: 'history' | 'new_comment' | 'edit_comment' | 'delete_comment' | 'error' | 'typing';
+  type: 'history' | 'history_page' | 'new_comment' | 'edit_comment' | 'delete_comment' | 'error' | 'typing' | 'typing_stopped' | 'ping' | 'pong' | 'batch';
   data?: any;
+  events?: WebSocketMessage[];
+  since_id?: number | null;
+  has_more?: boolean;
   message?: string;
   user_id?: number;
   username?: string;
@@ -40,16 +43,29 @@ export const useTaskComments = (taskId: number) => {
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [typingUsers, setTypingUsers] = useState<{[key: number]: string}>({});
+  const [hasMore, setHasMore] = useState(false);
+  // Увеличивается для переподключения после закрытия сервером за простой
+  const [reconnectKey, setReconnectKey] = useState(0);
   
   const socketRef = useRef<WebSocket | null>(null);
+  // ID последнего полученного комментария,
+  // при переподключении загружаются только более новые
+  const lastCommentIdRef = useRef<number | null>(null);
+  const lastTaskIdRef = useRef<number | null>(null);
+  // Догрузка пропущенных при переподключении комментариев: нижняя граница запроса
+  // и ID самого нового полученного комментария, который станет lastCommentIdRef
+  const catchUpRef = useRef<{ sinceId: number; lastId: number } | null>(null);
   const typingTimeoutsRef = useRef<{[key: number]: NodeJS.Timeout}>({});
+  const closedIdleRef = useRef(false);
   
   // Получение URL для WebSocket
   const getWebSocketUrl = useCallback(() => {
     const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
     // Используем правильный адрес бэкенда
     const apiBaseUrl = 'localhost:8080'; // Замените на ваш реальный адрес бэкенда
-    return `${protocol}//${apiBaseUrl}/api/v1/tasks/${taskId}/comments?token=${token}`;
+    const sinceId = lastTaskIdRef.current === taskId ? lastCommentIdRef.current : null;
+    const cursor = sinceId !== null ? `&since_id=${sinceId}` : '';
+    return `${protocol}//${apiBaseUrl}/api/v1/tasks/${taskId}/comments?token=${token}&batch=1${cursor}`;
   }, [taskId, token]);
   
   // Создание и управление WebSocket соединением
@@ -73,7 +89,11 @@ export const useTaskComments = (taskId: number) => {
     socket.onclose = (event) => {
       console.log("WebSocket connection closed", event);
       setIsConnected(false);
-      if (event.code !== 1000) {
+      if (event.reason === 'idle') {
+        // Сервер закрыл простаивающее соединение,
+        // переподключимся при возврате пользователя
+        closedIdleRef.current = true;
+      } else if (event.code !== 1000) {
         setError('WebSocket connection closed unexpectedly');
       }
     };
@@ -84,60 +104,160 @@ export const useTaskComments = (taskId: number) => {
       setIsConnected(false);
     };
     
-    socket.onmessage = (event) => {
-      try {
-        const message: WebSocketMessage = JSON.parse(event.data);
-        
-        switch (message.type) {
-          case 'history':
+    // Запрос более старой страницы пропущенных комментариев в границах since_id
+    const requestCatchUpPage = (sinceId: number, beforeId: number) => {
+      socket.send(JSON.stringify({
+        type: 'load_more',
+        since_id: sinceId,
+        before_id: beforeId
+      }));
+    };
+    
+    // Пропущенные комментарии догружены,
+    // следующее переподключение начнется с последнего
+    const finishCatchUp = () => {
+      if (catchUpRef.current) {
+        lastCommentIdRef.current = catchUpRef.current.lastId;
+        catchUpRef.current = null;
+      }
+      setIsLoading(false);
+    };
+    
+    // Обработка одного события, пакет batch разбирается на события по порядку
+    const handleMessage = (message: WebSocketMessage) => {
+      switch (message.type) {
+        case 'ping':
+          socket.send(JSON.stringify({ type: 'pong' }));
+          break;
+          
+        case 'pong':
+          break;
+          
+        case 'history':
+          lastTaskIdRef.current = taskId;
+          if (message.since_id !== undefined && message.since_id !== null) {
+            // Переподключение: дописываем только недостающие комментарии. Пришла
+            // самая новая страница, более старые пропущенные запрашиваем, пока has_more
+            const sinceId = message.since_id;
+            setComments(prev => [...prev, ...message.data]);
+            const lastId = message.data.length > 0
+              ? message.data[message.data.length - 1].id
+              : sinceId;
+            catchUpRef.current = { sinceId, lastId };
+            if (message.has_more && message.data.length > 0) {
+              requestCatchUpPage(sinceId, message.data[0].id);
+            } else {
+              finishCatchUp();
+            }
+          } else {
+            catchUpRef.current = null;
             setComments(message.data);
+            setHasMore(Boolean(message.has_more));
+            if (message.data.length > 0) {
+              lastCommentIdRef.current = message.data[message.data.length - 1].id;
+            }
             setIsLoading(false);
-            break;
-            
-          case 'new_comment':
-            setComments(prev => [...prev, { ...message.data, is_edited: false }]);
-            break;
-            
-          case 'edit_comment':
-            setComments(prev => prev.map(comment => 
-              comment.id === message.data.id 
-                ? { ...message.data, is_edited: true }
-                : comment
-            ));
-            break;
-            
-          case 'delete_comment':
-            setComments(prev => prev.filter(comment => 
-              comment.id !== message.data.comment_id
-            ));
-            break;
+          }
+          break;
+          
+        case 'history_page':
+          if (message.since_id !== undefined && message.since_id !== null) {
+            // Страница пропущенных комментариев встает между уже загруженными
+            // и полученными после переподключения
+            const sinceId = message.since_id;
+            setComments(prev => {
+              const gap = prev.findIndex(comment => comment.id > sinceId);
+              return gap === -1
+                ? [...prev, ...message.data]
+                : [...prev.slice(0, gap), ...message.data, ...prev.slice(gap)];
+            });
+            if (message.has_more && message.data.length > 0) {
+              requestCatchUpPage(sinceId, message.data[0].id);
+            } else {
+              finishCatchUp();
+            }
+          } else {
+            setComments(prev => [...message.data, ...prev]);
+            setHasMore(Boolean(message.has_more));
+          }
+          break;
+          
+        case 'new_comment':
+          setComments(prev => [...prev, { ...message.data, is_edited: false }]);
+          if (catchUpRef.current) {
+            const { lastId } = catchUpRef.current;
+            catchUpRef.current.lastId = Math.max(lastId, message.data.id);
+          } else {
+            const lastId = lastCommentIdRef.current ?? 0;
+            lastCommentIdRef.current = Math.max(lastId, message.data.id);
+          }
+          break;
+          
+        case 'edit_comment':
+          setComments(prev => prev.map(comment => 
+            comment.id === message.data.id 
+              ? { ...message.data, is_edited: true }
+              : comment
+          ));
+          break;
+          
+        case 'delete_comment':
+          setComments(prev => prev.filter(comment => 
+            comment.id !== message.data.comment_id
+          ));
+          break;
+          
+        case 'error':
+          setError(message.message || 'Unknown error');
+          break;
+          
+        case 'typing':
+          if (message.user_id && message.username) {
+            setTypingUsers(prev => ({
+              ...prev,
+              [message.user_id!]: message.username!
+            }));
             
-          case 'error':
-            setError(message.message || 'Unknown error');
-            break;
+            // Очищаем предыдущий таймаут
+            if (typingTimeoutsRef.current[message.user_id]) {
+              clearTimeout(typingTimeoutsRef.current[message.user_id]);
+            }
             
-          case 'typing':
-            if (message.user_id && message.username) {
-              setTypingUsers(prev => ({
-                ...prev,
-                [message.user_id!]: message.username!
-              }));
-              
-              // Очищаем предыдущий таймаут
-              if (typingTimeoutsRef.current[message.user_id]) {
-                clearTimeout(typingTimeoutsRef.current[message.user_id]);
-              }
-              
-              // Устанавливаем новый таймаут
-              typingTimeoutsRef.current[message.user_id] = setTimeout(() => {
-                setTypingUsers(prev => {
-                  const newState = { ...prev };
-                  delete newState[message.user_id!];
-                  return newState;
-                });
-              }, 3000);
+            // Устанавливаем новый таймаут
+            typingTimeoutsRef.current[message.user_id] = setTimeout(() => {
+              setTypingUsers(prev => {
+                const newState = { ...prev };
+                delete newState[message.user_id!];
+                return newState;
+              });
+            }, 3000);
+          }
+          break;
+          
+        case 'typing_stopped':
+          if (message.user_id) {
+            if (typingTimeoutsRef.current[message.user_id]) {
+              clearTimeout(typingTimeoutsRef.current[message.user_id]);
+              delete typingTimeoutsRef.current[message.user_id];
             }
-            break;
+            setTypingUsers(prev => {
+              const newState = { ...prev };
+              delete newState[message.user_id!];
+              return newState;
+            });
+          }
+          break;
+      }
+    };
+    
+    socket.onmessage = (event) => {
+      try {
+        const message: WebSocketMessage = JSON.parse(event.data);
+        
+        if (message.type === 'batch') {
+          message.events?.forEach(handleMessage);
+        } else {
+          handleMessage(message);
         }
       } catch (err) {
         console.error('Error parsing WebSocket message:', err);
@@ -151,7 +271,24 @@ export const useTaskComments = (taskId: number) => {
         socket.close();
       }
     };
-  }, [taskId, token, getWebSocketUrl]);
+  }, [taskId, token, getWebSocketUrl, reconnectKey]);
+  
+  // Переподключение после закрытия за простой, когда пользователь вернулся на страницу
+  useEffect(() => {
+    const reconnectIfIdle = () => {
+      if (closedIdleRef.current && document.visibilityState === 'visible') {
+        closedIdleRef.current = false;
+        setReconnectKey(key => key + 1);
+      }
+    };
+    
+    window.addEventListener('focus', reconnectIfIdle);
+    document.addEventListener('visibilitychange', reconnectIfIdle);
+    return () => {
+      window.removeEventListener('focus', reconnectIfIdle);
+      document.removeEventListener('visibilitychange', reconnectIfIdle);
+    };
+  }, []);
   
   // Функция для отправки нового комментария
   const sendComment = useCallback((text: string, mention_ids: number[] = []) => {
@@ -215,6 +352,18 @@ export const useTaskComments = (taskId: number) => {
     }
   }, []);
   
+  // Функция для загрузки более старых комментариев
+  const loadMore = useCallback(() => {
+    if (!socketRef.current || socketRef.current.readyState !== WebSocket.OPEN) return false;
+    if (comments.length === 0) return false;
+    
+    socketRef.current.send(JSON.stringify({
+      type: "load_more",
+      before_id: comments[0].id
+    }));
+    return true;
+  }, [comments]);
+  
   // Функция для отправки уведомления о печати
   const sendTypingNotification = useCallback(() => {
     if (!socketRef.current || socketRef.current.readyState !== WebSocket.OPEN) return;
@@ -237,6 +386,8 @@ export const useTaskComments = (taskId: number) => {
     editComment,
     deleteComment,
     typingUsers,
-    sendTypingNotification
+    sendTypingNotification,
+    hasMore,
+    loadMore
   };
 };
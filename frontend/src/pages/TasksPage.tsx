@@ -6,7 +6,7 @@ import { useDispatch, useSelector } from 'react-redux';
 import { format } from 'date-fns';
 
 import { RootState, AppDispatch } from '../store';
-import { fetchTasks, fetchMyTasks, fetchCreatedTasks, fetchAssignedTasks, fetchWatchingTasks } from '../store/slices/taskSlice';
+import { fetchTasks, fetchDashboard } from '../store/slices/taskSlice';
 import { fetchStatuses } from '../store/slices/statusSlice';
 import TaskItem from '../components/tasks/TaskItem';
 import TaskFilter from '../components/tasks/TaskFilter';
@@ -27,10 +27,7 @@ const TasksPage = () => {
       dispatch(fetchTasks());
     }
     
-    dispatch(fetchMyTasks());
-    dispatch(fetchCreatedTasks());
-    dispatch(fetchAssignedTasks());
-    dispatch(fetchWatchingTasks());
+    dispatch(fetchDashboard());
     dispatch(fetchStatuses());
   }, [dispatch, isSuperuser]);
 
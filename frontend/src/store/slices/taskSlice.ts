@@ -90,6 +90,19 @@ export const fetchWatchingTasks = createAsyncThunk(
   }
 );
 
+export const fetchDashboard = createAsyncThunk(
+  'tasks/fetchDashboard',
+  async (_, { rejectWithValue }) => {
+    try {
+      const dashboard = await api.tasks.getDashboard();
+      return dashboard;
+    } catch (error: any) {
+      const message = error.response?.data?.detail || 'Failed to fetch your tasks';
+      return rejectWithValue(message);
+    }
+  }
+);
+
 export const fetchTaskById = createAsyncThunk(
   'tasks/fetchById',
   async (id: number, { rejectWithValue }) => {
@@ -219,6 +232,26 @@ const taskSlice = createSlice({
         state.error = action.payload as string;
       })
       
+      // Fetch Dashboard (my, created, assigned and watching tasks at once)
+      .addCase(fetchDashboard.pending, (state) => {
+        state.loading = true;
+        state.error = null;
+      })
+      .addCase(fetchDashboard.fulfilled, (state, action) => {
+        const { created, assigned, watching, tasks } = action.payload;
+        state.myTasks = Object.values(tasks).sort((a, b) =>
+          (b.updated_at || b.created_at).localeCompare(a.updated_at || a.created_at) || b.id - a.id
+        );
+        state.createdTasks = created.map((id) => tasks[id]);
+        state.assignedTasks = assigned.map((id) => tasks[id]);
+        state.watchingTasks = watching.map((id) => tasks[id]);
+        state.loading = false;
+      })
+      .addCase(fetchDashboard.rejected, (state, action) => {
+        state.loading = false;
+        state.error = action.payload as string;
+      })
+      
       // Fetch Task by ID
       .addCase(fetchTaskById.pending, (state) => {
         state.loading = true;
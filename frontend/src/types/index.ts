@@ -48,6 +48,13 @@ export interface UserLoginData {
     watchers: User[];
   }
   
+  export interface TaskDashboard {
+    created: number[];
+    assigned: number[];
+    watching: number[];
+    tasks: Record<number, TaskDetail>;
+  }
+  
   export interface TaskCreate {
     title: string;
     description?: string;